@@ -1,4 +1,12 @@
 from .ethernet import ethernet
+from .async_ethernet import async_ethernet
 from .gpib_prologix import gpib_prologix
+from .gpib_prologix import gpib_prologix_bus
 from .serial import serial
 from .usb import usb
+from .loopback import loopback
+from .monitor import latency_histogram
+from .monitor import byte_counter
+from .monitor import error_counter
+from .replay import replay
+from .replay import recorder
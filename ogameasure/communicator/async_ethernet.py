@@ -0,0 +1,95 @@
+import asyncio
+import socket
+from . import communicator
+
+
+class async_ethernet(communicator.communicator):
+    """
+    asyncio version of the ethernet communicator.
+
+    All I/O methods are coroutines, so that several instruments can be
+    queried concurrently from one event loop:
+
+    >>> com1 = async_ethernet('192.168.100.1', 5025)
+    >>> com2 = async_ethernet('192.168.100.2', 5025)
+    >>> await asyncio.gather(com1.open(), com2.open())
+    >>> await asyncio.gather(com1.query('*IDN?'), com2.query('*IDN?'))
+
+    <limit> is the buffer limit of the stream reader (bytes), which bounds
+    the length of a line returned by readline() (e.g. an ASCII trace).
+    """
+    method = "async_ethernet"
+
+    host = ""
+    port = 0
+    timeout = 3
+    family = ""
+    limit = 2 ** 24
+
+    def __init__(self, host, port, timeout=3, family=socket.AF_INET, limit=None):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.family = family
+        if limit is not None: self.limit = limit
+        self.lock = None
+        pass
+
+    async def _wait(self, coro):
+        try:
+            return await asyncio.wait_for(coro, self.timeout)
+        except asyncio.TimeoutError:
+            raise socket.timeout("timed out")
+
+    async def open(self):
+        if self.connection == False:
+            self.reader, self.writer = await self._wait(
+                asyncio.open_connection(self.host, self.port, family=self.family,
+                                        limit=self.limit)
+            )
+            self.lock = asyncio.Lock()
+            self.connection = True
+            pass
+        return
+
+    async def close(self):
+        try:
+            self.writer.close()
+            await self.writer.wait_closed()
+        except AttributeError:
+            pass
+        self.reader = None
+        self.writer = None
+        self.connection = False
+        return
+
+    @communicator.instrumented
+    async def send(self, msg):
+        self.writer.write((msg + self.terminator).encode())
+        await self.writer.drain()
+        return
+
+    @communicator.instrumented
+    async def send_raw(self, msg):
+        self.writer.write(msg)
+        await self.writer.drain()
+        return
+
+    @communicator.instrumented
+    async def recv(self, byte=1024):
+        ret = await self._wait(self.reader.read(byte))
+        return ret
+
+    @communicator.instrumented
+    async def readline(self):
+        ret = await self._wait(self.reader.readline())
+        return ret.decode()
+
+    async def query(self, msg):
+        # send and readline are done under the lock so that concurrent
+        # tasks sharing one connection do not steal each other's response.
+        async with self.lock:
+            await self.send(msg)
+            ret = await self.readline()
+            pass
+        return ret
@@ -1,9 +1,109 @@
+import time
+import inspect
+import functools
+import numpy
+
+
+class transaction(object):
+    """
+    One send/recv/readline call of a communicator, passed to the hooks.
+
+    < com : communicator >
+    < method : str : 'send','send_raw','recv','readline' >
+    < data : str or bytes >
+        The message sent, or the data received (None on error).
+    < start : float >
+        time.time() when the call started.
+    < elapsed : float >
+        Duration of the call in seconds (time.perf_counter()).
+    < error : Exception >
+        The exception raised by the call, or None.
+    """
+    __slots__ = ('com', 'method', 'data', 'start', 'elapsed', 'error')
+
+    def __init__(self, com, method, data, start, elapsed, error=None):
+        self.com = com
+        self.method = method
+        self.data = data
+        self.start = start
+        self.elapsed = elapsed
+        self.error = error
+        pass
+
+    @property
+    def end(self):
+        return self.start + self.elapsed
+
+    @property
+    def nbytes(self):
+        if self.data is None: return 0
+        if type(self.data) == list:
+            return sum(len(d) for d in self.data)
+        return len(self.data)
+
+    def __repr__(self):
+        return '<transaction %s %s %r %.6f sec>'%(
+            self.com.method, self.method, self.data, self.elapsed)
+
+
+def _call_hooks(com, method, args, ret, start, t0, error):
+    if method.startswith('send'): data = args[0]
+    else: data = ret
+    tr = transaction(com, method, data, start, time.perf_counter() - t0, error)
+    for hook in com._hooks:
+        hook(tr)
+        continue
+    return
+
+
+def instrumented(func):
+    """
+    Decorator for the I/O methods of the communicators, which calls the
+    hooks added by add_hook(). Without hooks the method is called as is.
+    """
+    method = func.__name__
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            if not self._hooks:
+                return await func(self, *args, **kwargs)
+            start = time.time()
+            t0 = time.perf_counter()
+            try:
+                ret = await func(self, *args, **kwargs)
+            except Exception as e:
+                _call_hooks(self, method, args or tuple(kwargs.values()), None, start, t0, e)
+                raise
+            _call_hooks(self, method, args or tuple(kwargs.values()), ret, start, t0, None)
+            return ret
+        return wrapper
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if not self._hooks:
+            return func(self, *args, **kwargs)
+        start = time.time()
+        t0 = time.perf_counter()
+        try:
+            ret = func(self, *args, **kwargs)
+        except Exception as e:
+            _call_hooks(self, method, args or tuple(kwargs.values()), None, start, t0, e)
+            raise
+        _call_hooks(self, method, args or tuple(kwargs.values()), ret, start, t0, None)
+        return ret
+    return wrapper
+
+
 class communicator(object):
     method = 'communicator_base_class'
     connection = False
 
     terminator = '\n'
 
+    # hooks called with a transaction for each send/recv/readline
+    _hooks = ()
+
     def __init__(self, *args):
         if len(args)!=0:
             self.open(*args)
@@ -28,3 +128,120 @@ class communicator(object):
 
     def readline(self):
         pass
+
+    def read_exact(self, n):
+        ret = bytearray(n)
+        self.read_into(ret)
+        return ret
+
+    def read_into(self, buffer):
+        raise NotImplementedError('%s does not support binary reads'%(self.method))
+
+    @instrumented
+    def read_block(self, terminated=True, out=None):
+        """
+        Read an IEEE 488.2 definite length arbitrary block '#<n><length><data>'.
+
+        The data are read into a bytearray allocated for the declared length,
+        or directly into <out> (a writable buffer, e.g. a numpy array row)
+        if given. With <terminated>=True, the response message terminator
+        following the block ('\\n' or '\\r\\n') is consumed.
+        An indefinite length block ('#0<data>\\n') is read up to the '\\n'.
+
+        Returns
+        =======
+        < data : bytearray, or memoryview of <out> >
+        """
+        head = self.read_exact(2)
+        while head[:1] in (b' ', b'\r', b'\n'):
+            head = head[1:] + self.read_exact(1)
+            continue
+        if head[:1] != b'#' or not head[1:2].isdigit():
+            raise ValueError('not a binary block: %r'%(bytes(head)))
+        ndigits = int(head[1:2])
+        if ndigits == 0:
+            ret = bytearray()
+            while not ret.endswith(b'\n'):
+                ret += self.read_exact(1)
+                continue
+            ret = ret[:-1]
+            if out is None: return ret
+            view = memoryview(out).cast('B')[:len(ret)]
+            view[:] = ret
+            return view
+        length = int(self.read_exact(ndigits))
+        if out is None:
+            ret = bytearray(length)
+        else:
+            ret = memoryview(out).cast('B')
+            if length > len(ret):
+                raise ValueError('block of %d bytes does not fit in %d bytes'%(
+                    length, len(ret)))
+            ret = ret[:length]
+            pass
+        self.read_into(ret)
+        if terminated:
+            self._read_terminator()
+            pass
+        return ret
+
+    @instrumented
+    def read_blocks(self, num, terminated=True):
+        """
+        Read <num> definite length blocks of one response message, i.e. the
+        responses of <num> queries sent in one program message, which are
+        separated by ';'.
+
+        Returns
+        =======
+        < data : list of bytearray >
+        """
+        ret = []
+        for i in range(num):
+            if i != 0:
+                sep = self.read_exact(1)
+                if sep != b';':
+                    raise ValueError('expected ";" between blocks, got %r'%(bytes(sep)))
+                pass
+            ret.append(communicator.read_block.__wrapped__(self, False))
+            continue
+        if terminated:
+            self._read_terminator()
+            pass
+        return ret
+
+    def _read_terminator(self):
+        if self.read_exact(1) == b'\r':
+            self.read_exact(1)
+            pass
+        return
+
+    def read_block_array(self, dtype='<f4', terminated=True, out=None):
+        """
+        Read a binary block as a numpy array of <dtype>, e.g. '<f4' for
+        little endian float32 (FORM REAL,32 with swapped byte order) or
+        '>f8' for big endian float64.
+
+        With <out> (a contiguous numpy array of <dtype>), the data are read
+        into it without a copy, and the filled part of <out> is returned.
+        """
+        if out is None:
+            return numpy.frombuffer(self.read_block(terminated), dtype=dtype)
+        if out.dtype != numpy.dtype(dtype):
+            raise ValueError('out must be of %s, not %s'%(dtype, out.dtype))
+        data = self.read_block(terminated, out)
+        return out[:len(data) // out.itemsize]
+
+    def add_hook(self, hook):
+        """
+        Call <hook>(transaction) after every send/recv/readline.
+
+        See monitor.py for the built-in collectors. A hook must not raise;
+        its exceptions propagate to the caller of the I/O method.
+        """
+        self._hooks = self._hooks + (hook,)
+        return
+
+    def remove_hook(self, hook):
+        self._hooks = tuple(h for h in self._hooks if h != hook)
+        return
@@ -3,22 +3,40 @@ from . import communicator
 
 
 class ethernet(communicator.communicator):
+    """
+    TCP socket communicator.
+
+    Responses are read with recv_into() into a receive buffer (a
+    bytearray of <bufsize> bytes, grown when a longer line arrives), from
+    which readline_raw(), read_until(), read_exact() and read_block() cut out
+    the data.
+    readline() returns the decoded line with '\r\n' translated to '\n',
+    as the text mode file object used before.
+
+    With <nodelay>=True (default), TCP_NODELAY is set on the socket. A
+    command is often followed by another write (e.g. SYST:ERR?), which
+    Nagle's algorithm and the delayed ACK of the device stall for ~40 ms.
+    """
     method = "ethernet"
+    bufsize = 65536
 
     host = ""
     port = 0
     timeout = 3
     family = ""
     type = ""
+    nodelay = True
 
     def __init__(
-        self, host, port, timeout=3, family=socket.AF_INET, type=socket.SOCK_STREAM
+        self, host, port, timeout=3, family=socket.AF_INET, type=socket.SOCK_STREAM,
+        nodelay=True
     ):
         self.host = host
         self.port = port
         self.timeout = timeout
         self.family = family
         self.type = type
+        self.nodelay = nodelay
         pass
 
     def open(self):
@@ -26,18 +44,18 @@ class ethernet(communicator.communicator):
         if self.connection == False:
             self.sock = socket.socket(self.family, self.type)
             self.sock.settimeout(self.timeout)
+            if self.nodelay and self.type == socket.SOCK_STREAM:
+                self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                pass
             self.sock.connect((self.host, self.port))
-            self.sockfp = self.sock.makefile()
+            self._init_buffer()
             self.connection = True
             pass
         return
 
     def close(self):
+        self._init_buffer()
         try:
-            try:
-                self.sockfp.close()
-            except AttributeError:
-                pass
             self.sock.close()
         except AttributeError:
             pass
@@ -45,18 +63,139 @@ class ethernet(communicator.communicator):
         self.connection = False
         return
 
+    @communicator.instrumented
     def send(self, msg):
         self.sock.send((msg + self.terminator).encode())
         return
 
+    @communicator.instrumented
     def send_raw(self, msg):
         self.sock.send(msg)
         return
 
+    @communicator.instrumented
     def recv(self, byte=1024):
+        if self._end > self._start:
+            n = min(byte, self._end - self._start)
+            ret = self._take(n)
+            return ret
         ret = self.sock.recv(byte)
         return ret
 
+    @communicator.instrumented
     def readline(self):
-        ret = self.sockfp.readline()
+        # universal newlines as the former makefile() reader: '\n', '\r\n'
+        # and a lone '\r' end a line, and are returned as '\n'
+        if self._skip_lf:
+            self._skip_lf = False
+            if self._end == self._start: self._fill()
+            if self._buf[self._start:self._start + 1] == b'\n': self._take(1)
+            pass
+        pos = self._start
+        while True:
+            i = self._find_eol(pos)
+            if i != -1: break
+            # _fill() may move the data to the head of the buffer
+            offset = self._end - self._start
+            if self._fill() == 0:
+                return self._take(self._end - self._start).decode()
+            pos = self._start + offset
+            continue
+        if self._buf[i] == 0x0a:
+            ret = self._take(i + 1 - self._start)
+        elif i + 1 < self._end:
+            lf = self._buf[i + 1] == 0x0a
+            ret = self._take(i + 1 + lf - self._start)
+        else:
+            # '\r' at the end of the received data: drop a following '\n'
+            ret = self._take(i + 1 - self._start)
+            self._skip_lf = True
+            pass
+        return ret.rstrip(b'\r\n').decode() + '\n'
+
+    def _find_eol(self, pos):
+        i_lf = self._buf.find(b'\n', pos, self._end)
+        i_cr = self._buf.find(b'\r', pos, self._end)
+        if i_cr == -1: return i_lf
+        if i_lf == -1: return i_cr
+        return min(i_lf, i_cr)
+
+    def readline_raw(self):
+        """Read a line as bytes, including the terminating b'\\n'."""
+        return self.read_until(b'\n')
+
+    def read_until(self, terminator=b'\n'):
+        """
+        Read bytes up to and including <terminator>.
+        Returns the data read so far if the connection is closed.
+        """
+        pos = self._start
+        while True:
+            i = self._buf.find(terminator, pos, self._end)
+            if i != -1:
+                return self._take(i + len(terminator) - self._start)
+            # search the new data only (keep the last bytes of a split terminator)
+            pos = max(self._start, self._end - len(terminator) + 1)
+            offset = pos - self._start
+            if self._fill() == 0:
+                return self._take(self._end - self._start)
+            pos = self._start + offset
+            continue
+
+    def read_into(self, buffer):
+        """
+        Fill <buffer> (a writable bytes-like object) with the received
+        data. The data after the buffered ones are received directly into
+        <buffer> without copying.
+        """
+        view = memoryview(buffer).cast('B')
+        try:
+            n = min(len(view), self._end - self._start)
+            view[:n] = self._buf[self._start:self._start + n]
+            self._start += n
+            while n < len(view):
+                r = self.sock.recv_into(view[n:])
+                if r == 0:
+                    raise ConnectionError('connection closed by %s:%d'%(
+                        self.host, self.port))
+                n += r
+                continue
+        finally:
+            view.release()
+            pass
+        return
+
+    def _init_buffer(self):
+        self._skip_lf = False
+        self._buf = bytearray(self.bufsize)
+        self._start = 0
+        self._end = 0
+        return
+
+    def _take(self, n):
+        with memoryview(self._buf) as view:
+            ret = bytes(view[self._start:self._start + n])
+            pass
+        self._start += n
+        if self._start == self._end:
+            self._start = self._end = 0
+            pass
         return ret
+
+    def _fill(self):
+        # move the data to the head of the buffer, or grow it when full
+        if self._end == len(self._buf):
+            length = self._end - self._start
+            if self._start > 0:
+                self._buf[:length] = self._buf[self._start:self._end]
+            else:
+                self._buf.extend(bytes(len(self._buf)))
+                pass
+            self._start = 0
+            self._end = length
+            pass
+        with memoryview(self._buf) as view:
+            n = self.sock.recv_into(view[self._end:])
+            pass
+        self._end += n
+        return n
@@ -1,8 +1,31 @@
 import time
+import collections
+import threading
 from . import communicator
 from . import ethernet
 
 class gpib_prologix(communicator.communicator):
+    """
+    GPIB device behind a Prologix GPIB-ETHERNET adapter.
+
+    <pacing> selects how the end of an instrument operation is detected:
+
+      'fixed' : sleep <lag> seconds after every write (default). Use this
+                for devices that need a pause between commands.
+      'eoi'   : no sleeps. A read waits with '++read eoi' until the device
+                asserts EOI, which is enough for most instruments.
+      'spoll' : as 'eoi', but poll the status byte with '++spoll' until the
+                Message AVailable bit is set before reading.
+
+    The time between a command and the arrival of its response is stored
+    in <last_wait> and appended to <wait_log>.
+
+    With <auto_read>=True the adapter is put in '++auto 1' mode for query
+    messages (those containing '?'), so that the response is read
+    automatically after the write without a separate '++read'. Other
+    messages are sent with '++auto 0' to avoid addressing the device to
+    talk. query() always uses this path.
+    """
     method ='gpib_prologix'
 
     open_flag = False
@@ -10,24 +33,69 @@ class gpib_prologix(communicator.communicator):
     host = ''
     gpibport = 10
     lag = 0.02
+    pacing = 'fixed'
+    pacing_modes = ('fixed', 'eoi', 'spoll')
 
-    def __init__(self, host, gpibport=10, lag=0.02, timeout=10):
+    mav_bit = 0x10
+    spoll_interval = 0.001
+    last_wait = None
+    _t_send = None
+
+    auto_read = False
+    _auto = None
+
+    def __init__(self, host, gpibport=10, lag=0.02, timeout=10, pacing='fixed',
+                 auto_read=False):
         self.gpibport = gpibport
         self.lag = lag
+        self.auto_read = auto_read
         if type(host) == str:
             self.com = ethernet(host, 1234, timeout)
         else:
             self.com = host
+        self._init_pacing(pacing)
         pass
 
+    def _init_pacing(self, pacing):
+        if pacing not in self.pacing_modes:
+            raise ValueError('pacing must be one of %s'%(str(self.pacing_modes)))
+        self.pacing = pacing
+        self.wait_log = collections.deque(maxlen=1000)
+        return
+
     def _sleep(self):
-        time.sleep(self.lag)
+        if self.pacing == 'fixed':
+            time.sleep(self.lag)
+            pass
+        return
+
+    def _record_wait(self):
+        if self._t_send is not None:
+            self.last_wait = time.perf_counter() - self._t_send
+            self.wait_log.append(self.last_wait)
+            self._t_send = None
+            pass
+        return
+
+    def _wait_message_available(self):
+        timeout = getattr(self.com, 'timeout', 10)
+        t0 = time.perf_counter()
+        while not (self.serial_poll() & self.mav_bit):
+            if time.perf_counter() - t0 > timeout:
+                raise TimeoutError('gpib %d: no response within %.1f sec'%(
+                    self.gpibport, timeout))
+            time.sleep(self.spoll_interval)
+            continue
         return
 
     def open(self):
         if self.open_flag == False:
             self.com.open()
+            self._auto = None
             self.mode_controller()
+            if self.pacing != 'fixed':
+                self._send('++eoi 1')
+                pass
             self.open_flag = True
             pass
         return
@@ -37,10 +105,20 @@ class gpib_prologix(communicator.communicator):
         self.open_flag = False
         return
 
+    @communicator.instrumented
     def send(self, msg):
         self.use_gpibport()
+        if self.auto_read:
+            self._set_auto(int('?' in msg))
+        elif self._auto != 0:
+            # None: unknown after open, the adapter may be left in '++auto 1'
+            self._set_auto(0)
+            pass
         self.com.send((msg+self.terminator))
-        self._sleep()
+        self._t_send = time.perf_counter()
+        if not self._auto:
+            self._sleep()
+            pass
         return
 
     def _send(self, msg):
@@ -48,14 +126,64 @@ class gpib_prologix(communicator.communicator):
         self._sleep()
         return
 
+    def _set_auto(self, auto):
+        if self._auto != auto:
+            self._send('++auto %d'%(auto))
+            self._auto = auto
+            pass
+        return
+
+    def _request_read(self, cmd):
+        if not self._auto:
+            if self.pacing == 'spoll' and self._t_send is not None:
+                self._wait_message_available()
+                pass
+            self._send(cmd)
+            pass
+        return
+
+    @communicator.instrumented
     def recv(self, byte=1024):
-        self._send('++read %d'%byte)
+        self._request_read('++read %d'%byte)
         ret = self.com.recv(byte)
+        self._record_wait()
         return ret
 
+    @communicator.instrumented
     def readline(self):
-        self._send('++read eoi')
+        self._request_read('++read eoi')
         ret = self.com.readline()
+        self._record_wait()
+        return ret
+
+    @communicator.instrumented
+    def read_block(self, terminated=True, out=None):
+        self._request_read('++read eoi')
+        ret = self.com.read_block(terminated, out)
+        self._record_wait()
+        return ret
+
+    @communicator.instrumented
+    def read_blocks(self, num, terminated=True):
+        self._request_read('++read eoi')
+        ret = self.com.read_blocks(num, terminated)
+        self._record_wait()
+        return ret
+
+    def query(self, msg):
+        auto_read = self.auto_read
+        self.auto_read = True
+        try:
+            self.send(msg)
+            ret = self.readline()
+        finally:
+            self.auto_read = auto_read
+            pass
+        return ret
+
+    def serial_poll(self):
+        self._send('++spoll')
+        ret = int(self.com.readline().strip())
         return ret
 
     def get_info(self):
@@ -91,3 +219,223 @@ class gpib_prologix(communicator.communicator):
         self._send('++mode')
         ret = int(self.readline().strip())
         return ret
+
+
+class gpib_prologix_bus(object):
+    """
+    One Prologix GPIB-ETHERNET adapter shared by several GPIB devices.
+
+    The bus owns the single TCP connection to the adapter and hands out
+    per-address sessions, which can be used as the communicator of a
+    device driver. The currently selected address is remembered, and
+    '++addr' is only sent when a session with another address talks.
+    All sessions share <lock>, so that the bus can be used from multiple
+    threads. Hold the lock to make a multi-step transaction atomic:
+
+    >>> bus = gpib_prologix_bus('192.168.100.10')
+    >>> sg = ogameasure.Agilent.E8257D(bus.session(19))
+    >>> sa = ogameasure.Agilent.N9342C(bus.session(18))
+    >>> with bus.lock:
+    ...     sg.freq_set(10)
+    ...     sg.output_on()
+    """
+    method = 'gpib_prologix_bus'
+
+    terminator = '\n'
+    lag = 0.02
+    pacing = 'fixed'
+
+    def __init__(self, host, lag=0.02, timeout=10, pacing='fixed'):
+        self.lag = lag
+        self.pacing = pacing
+        if type(host) == str:
+            self.com = ethernet(host, 1234, timeout)
+        else:
+            self.com = host
+            pass
+        self.lock = threading.RLock()
+        self.gpibport = None
+        self.auto = None
+        self.open_count = 0
+        pass
+
+    def open(self):
+        with self.lock:
+            if self.open_count == 0:
+                self.com.open()
+                self.com.send('++mode 1' + self.terminator)
+                if self.pacing != 'fixed':
+                    self.com.send('++eoi 1' + self.terminator)
+                    pass
+                time.sleep(self.lag)
+                self.gpibport = None
+                self.auto = None
+                pass
+            self.open_count += 1
+            pass
+        return
+
+    def close(self):
+        with self.lock:
+            self.open_count -= 1
+            if self.open_count <= 0:
+                self.com.close()
+                self.open_count = 0
+                self.gpibport = None
+                pass
+            pass
+        return
+
+    def select(self, gpibport):
+        with self.lock:
+            if gpibport != self.gpibport:
+                self.com.send('++addr %d'%(gpibport) + self.terminator)
+                if self.pacing == 'fixed':
+                    time.sleep(self.lag)
+                    pass
+                self.gpibport = gpibport
+                pass
+            pass
+        return
+
+    def session(self, gpibport, pacing=None, auto_read=False):
+        """
+        <pacing> overrides the pacing of the bus for this device. Set
+        pacing='fixed' for a device that needs the <lag> between commands.
+        """
+        if pacing is None: pacing = self.pacing
+        return gpib_prologix_session(self, gpibport, pacing, auto_read)
+
+
+class gpib_prologix_session(gpib_prologix):
+    """
+    A GPIB address on a shared gpib_prologix_bus.
+
+    Use gpib_prologix_bus.session() to create it.
+
+    In '++auto 1' mode the adapter reads the response right after the
+    write, so the bus lock is kept from send() of a query to the read of
+    its response. Otherwise another session could read it.
+    """
+    method = 'gpib_prologix_session'
+
+    _held = 0
+
+    def __init__(self, bus, gpibport=10, pacing='fixed', auto_read=False):
+        self.bus = bus
+        self.com = bus.com
+        self.lag = bus.lag
+        self.gpibport = int(gpibport)
+        self.auto_read = auto_read
+        self.lock = bus.lock
+        self._init_pacing(pacing)
+        pass
+
+    # '++auto' is a state of the adapter, shared by all the sessions.
+    @property
+    def _auto(self):
+        return self.bus.auto
+
+    @_auto.setter
+    def _auto(self, auto):
+        self.bus.auto = auto
+        return
+
+    def open(self):
+        if self.open_flag == False:
+            self.bus.open()
+            self.open_flag = True
+            pass
+        return
+
+    def close(self):
+        if self.open_flag == True:
+            self.bus.close()
+            self.open_flag = False
+            pass
+        return
+
+    def send(self, msg):
+        self.lock.acquire()
+        try:
+            gpib_prologix.send(self, msg)
+        except:
+            self.lock.release()
+            raise
+        if self._auto:
+            # the response is on its way: released by the read
+            self._held += 1
+            return
+        self.lock.release()
+        return
+
+    def _release_held(self):
+        if self._held > 0:
+            self._held -= 1
+            self.lock.release()
+            pass
+        return
+
+    def recv(self, byte=1024):
+        with self.lock:
+            try:
+                self.use_gpibport()
+                ret = gpib_prologix.recv(self, byte)
+            finally:
+                self._release_held()
+                pass
+            pass
+        return ret
+
+    def readline(self):
+        with self.lock:
+            try:
+                self.use_gpibport()
+                ret = gpib_prologix.readline(self)
+            finally:
+                self._release_held()
+                pass
+            pass
+        return ret
+
+    def read_block(self, terminated=True, out=None):
+        with self.lock:
+            try:
+                self.use_gpibport()
+                ret = gpib_prologix.read_block(self, terminated, out)
+            finally:
+                self._release_held()
+                pass
+            pass
+        return ret
+
+    def read_blocks(self, num, terminated=True):
+        with self.lock:
+            try:
+                self.use_gpibport()
+                ret = gpib_prologix.read_blocks(self, num, terminated)
+            finally:
+                self._release_held()
+                pass
+            pass
+        return ret
+
+    def query(self, msg):
+        with self.lock:
+            ret = gpib_prologix.query(self, msg)
+            pass
+        return ret
+
+    def set_gpibport(self, gpib):
+        self.gpibport = int(gpib)
+        return
+
+    def use_gpibport(self):
+        self.bus.select(self.gpibport)
+        return
+
+    def get_gpibport(self):
+        return self.gpibport
+
+    def mode_device(self):
+        raise RuntimeError('The mode of a shared bus can not be changed')
@@ -0,0 +1,86 @@
+import socket
+from . import communicator
+
+
+class loopback(communicator.communicator):
+    """
+    In-process communicator connected to a simulated instrument.
+
+    Written messages are passed directly to <instrument>.feed(), and its
+    answers are read back from an internal buffer. readline() raises
+    socket.timeout when no complete line has been answered, as a real
+    communicator would after its timeout.
+
+    < terminator : str :  >
+        Terminator appended to sent messages.
+        default = the instrument's com_terminator
+
+    < recv_str : bool :  >
+        Return str from recv() when the data are ASCII, like the serial
+        communicator. default = the instrument's com_recv_str
+
+    Examples
+    ========
+    >>> com = loopback(ogameasure.simulator.N9938A())
+    >>> s = ogameasure.Agilent.N9938A(com)
+    """
+    method = 'loopback'
+
+    def __init__(self, instrument, terminator=None, recv_str=None):
+        self.instrument = instrument
+        if terminator is None: terminator = instrument.com_terminator
+        if recv_str is None: recv_str = instrument.com_recv_str
+        self.terminator = terminator
+        self.recv_str = recv_str
+        self.buffer = b''
+        pass
+
+    def open(self):
+        self.connection = True
+        return
+
+    def close(self):
+        self.buffer = b''
+        self.connection = False
+        return
+
+    @communicator.instrumented
+    def send(self, msg):
+        if type(msg) == str: msg = msg.encode()
+        self.buffer += self.instrument.feed(msg + self.terminator.encode())
+        return
+
+    @communicator.instrumented
+    def send_raw(self, msg):
+        self.buffer += self.instrument.feed(msg)
+        return
+
+    @communicator.instrumented
+    def recv(self, byte=1024):
+        if self.buffer == b'':
+            raise socket.timeout('timed out')
+        ret = self.buffer[:byte]
+        self.buffer = self.buffer[byte:]
+        if self.recv_str and ret.isascii():
+            return ret.decode()
+        return ret
+
+    @communicator.instrumented
+    def readline(self):
+        i = self.buffer.find(b'\n')
+        if i == -1:
+            raise socket.timeout('timed out')
+        ret = self.buffer[:i + 1]
+        self.buffer = self.buffer[i + 1:]
+        return ret.decode()
+
+    def read_into(self, buffer):
+        view = memoryview(buffer).cast('B')
+        n = len(view)
+        if len(self.buffer) < n:
+            view.release()
+            raise socket.timeout('timed out')
+        view[:] = self.buffer[:n]
+        view.release()
+        self.buffer = self.buffer[n:]
+        return
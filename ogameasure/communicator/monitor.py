@@ -0,0 +1,218 @@
+"""
+Collectors for the communicator hooks.
+
+>>> com = ogameasure.ethernet('192.168.100.1', 5025)
+>>> lat = latency_histogram()
+>>> com.add_hook(lat)
+>>> ... (use the device)
+>>> lat.summary()
+{'TRAC1:DATA?': {'count': 10, 'mean': 0.081, ...}, ...}
+"""
+import bisect
+import socket
+import threading
+
+
+def command_key(msg):
+    """Command header of a message, used as the key of the statistics."""
+    if type(msg) != str:
+        try:
+            msg = msg.decode('ascii')
+        except UnicodeDecodeError:
+            return 'binary'
+        pass
+    msg = msg.strip()
+    if msg == '' or not msg.isprintable(): return 'binary'
+    return msg.split(' ', 1)[0]
+
+
+class latency_histogram(object):
+    """
+    Histogram of the latency of each command.
+
+    The latency of a command is the time from the start of its send() to
+    the end of the last recv()/readline() before the next send(), i.e. the
+    round trip time for queries and the write time for the other commands.
+
+    < edges : list of float :  >
+        Bin edges in seconds. The default is logarithmic from 10 us to 100 s
+        (5 bins per decade). Latencies out of range are counted in the
+        first/last bin.
+    """
+
+    def __init__(self, edges=None):
+        if edges is None:
+            edges = [10 ** (i / 5) for i in range(-25, 11)]
+            pass
+        self.edges = list(edges)
+        self.lock = threading.Lock()
+        self.clear()
+        pass
+
+    def clear(self):
+        with self.lock:
+            self.stats = {}
+            self._pending = {}
+            pass
+        return
+
+    def __call__(self, tr):
+        with self.lock:
+            if tr.method.startswith('send'):
+                self._finish(tr.com)
+                if tr.error is None:
+                    self._pending[id(tr.com)] = [command_key(tr.data), tr.start, tr.end]
+                    pass
+            else:
+                pending = self._pending.get(id(tr.com))
+                if pending is not None and tr.error is None:
+                    pending[2] = tr.end
+                    pass
+                pass
+            pass
+        return
+
+    def _finish(self, com):
+        pending = self._pending.pop(id(com), None)
+        if pending is None: return
+        key, start, end = pending
+        self._add(key, end - start)
+        return
+
+    def _add(self, key, latency):
+        st = self.stats.get(key)
+        if st is None:
+            st = self.stats[key] = {
+                'count': 0, 'sum': 0., 'min': latency, 'max': latency,
+                'counts': [0] * (len(self.edges) - 1),
+            }
+            pass
+        st['count'] += 1
+        st['sum'] += latency
+        st['min'] = min(st['min'], latency)
+        st['max'] = max(st['max'], latency)
+        i = bisect.bisect_right(self.edges, latency) - 1
+        i = min(max(i, 0), len(st['counts']) - 1)
+        st['counts'][i] += 1
+        return
+
+    def flush(self):
+        """Close the commands waiting for more responses."""
+        with self.lock:
+            for key in list(self._pending):
+                pending = self._pending.pop(key)
+                self._add(pending[0], pending[2] - pending[1])
+                continue
+            pass
+        return
+
+    def percentile(self, key, q):
+        """Approximate <q>-th percentile (upper bin edge) of a command."""
+        st = self.stats[key]
+        n = st['count'] * q / 100.
+        total = 0
+        for i, c in enumerate(st['counts']):
+            total += c
+            if total >= n and c != 0:
+                return min(self.edges[i + 1], st['max'])
+            continue
+        return st['max']
+
+    def summary(self):
+        self.flush()
+        ret = {}
+        for key, st in self.stats.items():
+            ret[key] = {
+                'count': st['count'],
+                'mean': st['sum'] / st['count'],
+                'min': st['min'],
+                'max': st['max'],
+                'p50': self.percentile(key, 50),
+                'p95': self.percentile(key, 95),
+                'p99': self.percentile(key, 99),
+            }
+            continue
+        return ret
+
+
+class byte_counter(object):
+    """
+    Number of calls and bytes of send/recv/readline/read_block.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+        pass
+
+    def clear(self):
+        with self.lock:
+            self.calls = {}
+            self.bytes = {}
+            pass
+        return
+
+    def __call__(self, tr):
+        with self.lock:
+            self.calls[tr.method] = self.calls.get(tr.method, 0) + 1
+            self.bytes[tr.method] = self.bytes.get(tr.method, 0) + tr.nbytes
+            pass
+        return
+
+    @property
+    def sent(self):
+        return self.bytes.get('send', 0) + self.bytes.get('send_raw', 0)
+
+    @property
+    def received(self):
+        return (self.bytes.get('recv', 0) + self.bytes.get('readline', 0)
+                + self.bytes.get('read_block', 0) + self.bytes.get('read_blocks', 0))
+
+    def summary(self):
+        return {'sent': self.sent, 'received': self.received,
+                'calls': dict(self.calls), 'bytes': dict(self.bytes)}
+
+
+class error_counter(object):
+    """
+    Number of errors and timeouts of send/recv/readline.
+
+    A read that returns no data is also counted as a timeout, since
+    pyserial returns empty data instead of raising an exception.
+    The last <keep> errors are kept in <last> as (transaction, exception).
+    """
+
+    def __init__(self, keep=10):
+        self.keep = keep
+        self.lock = threading.Lock()
+        self.clear()
+        pass
+
+    def clear(self):
+        with self.lock:
+            self.errors = {}
+            self.timeouts = 0
+            self.last = []
+            pass
+        return
+
+    def __call__(self, tr):
+        if tr.error is None:
+            if tr.method in ('recv', 'readline') and not tr.data:
+                with self.lock:
+                    self.timeouts += 1
+                    pass
+                pass
+            return
+        with self.lock:
+            if isinstance(tr.error, (socket.timeout, TimeoutError)):
+                self.timeouts += 1
+                pass
+            name = type(tr.error).__name__
+            self.errors[name] = self.errors.get(name, 0) + 1
+            self.last = (self.last + [(tr, tr.error)])[-self.keep:]
+            pass
+        return
+
+    def summary(self):
+        return {'timeouts': self.timeouts, 'errors': dict(self.errors)}
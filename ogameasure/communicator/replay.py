@@ -0,0 +1,200 @@
+import gzip
+import json
+import time
+import base64
+import socket
+from . import communicator
+
+
+def _open(path, mode):
+    if str(path).endswith('.gz'):
+        return gzip.open(path, mode + 't')
+    return open(path, mode)
+
+
+def _encode(data):
+    if data is None: return {}
+    if type(data) == str: return {'s': data}
+    if type(data) == list:
+        return {'l': [base64.b64encode(bytes(d)).decode() for d in data]}
+    return {'b': base64.b64encode(bytes(data)).decode()}
+
+
+def _decode(ev):
+    if 's' in ev: return ev['s']
+    if 'b' in ev: return base64.b64decode(ev['b'])
+    if 'l' in ev: return [bytearray(base64.b64decode(d)) for d in ev['l']]
+    return None
+
+
+class recorder(object):
+    """
+    Record the transactions of a communicator to a JSON lines file.
+
+    Each line is one send/recv/readline with its data, the time since the
+    start of the recording and the elapsed time. The file is gzipped when
+    <path> ends with '.gz'. Play it back with the replay communicator.
+
+    Examples
+    ========
+    >>> com = ogameasure.ethernet('192.168.100.1', 5025)
+    >>> with ogameasure.recorder('n9938a.jsonl.gz', com):
+    ...     sa = ogameasure.Agilent.N9938A(com)
+    ...     sa.trace_data_query()
+    """
+
+    def __init__(self, path, com=None):
+        self.path = path
+        self.com = com
+        self.t0 = None
+        self.count = 0
+        self.f = _open(path, 'w')
+        self.f.write(json.dumps({'format': 'ogameasure-record', 'version': 1}) + '\n')
+        if com is not None:
+            com.add_hook(self)
+            pass
+        pass
+
+    def __call__(self, tr):
+        if self.t0 is None:
+            self.t0 = tr.start
+            pass
+        ev = {
+            'm': tr.method,
+            't': round(tr.start - self.t0, 6),
+            'e': round(tr.elapsed, 6),
+        }
+        ev.update(_encode(tr.data))
+        if tr.error is not None:
+            ev['err'] = type(tr.error).__name__
+            ev['msg'] = str(tr.error)
+            pass
+        self.f.write(json.dumps(ev) + '\n')
+        self.count += 1
+        return
+
+    def close(self):
+        if self.com is not None:
+            self.com.remove_hook(self)
+            pass
+        self.f.close()
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        return
+
+
+class replay(communicator.communicator):
+    """
+    Communicator which plays back a session recorded by recorder.
+
+    send() checks the message against the recording, and recv()/readline()
+    return the recorded responses, so that a driver can be run (and
+    profiled) without the instrument.
+
+    < timing : str : 'fast','original' >
+        'fast' returns immediately. 'original' sleeps the recorded elapsed
+        time of each call, i.e. reproduces the latency of the instrument.
+
+    < strict : bool >
+        Raise ValueError when a sent message (or the kind of call) differs
+        from the recording. With strict=False the recorded event is used
+        regardless of the message.
+
+    < loop : bool >
+        Start from the beginning again at the end of the recording,
+        for repeated runs of the same transactions.
+
+    Examples
+    ========
+    >>> com = ogameasure.replay('n9938a.jsonl.gz')
+    >>> sa = ogameasure.Agilent.N9938A(com)
+    >>> sa.trace_data_query()
+    """
+    method = 'replay'
+    timing_modes = ('fast', 'original')
+
+    def __init__(self, path, timing='fast', strict=True, loop=False):
+        if timing not in self.timing_modes:
+            raise ValueError('timing must be one of %s'%(str(self.timing_modes)))
+        self.path = path
+        self.timing = timing
+        self.strict = strict
+        self.loop = loop
+        with _open(path, 'r') as f:
+            lines = f.read().splitlines()
+            pass
+        self.events = [json.loads(l) for l in lines[1:] if l.strip() != '']
+        self.index = 0
+        pass
+
+    def open(self):
+        self.connection = True
+        return
+
+    def close(self):
+        self.connection = False
+        return
+
+    def rewind(self):
+        self.index = 0
+        return
+
+    def _next(self, method, data=None):
+        if self.index >= len(self.events):
+            if not (self.loop and self.events):
+                raise EOFError('end of the recording %s'%(self.path))
+            self.index = 0
+            pass
+        ev = self.events[self.index]
+        if self.strict:
+            if ev['m'] != method:
+                raise ValueError('replay: expected %s at event %d, got %s'%(
+                    ev['m'], self.index, method))
+            if method.startswith('send') and data != _decode(ev):
+                raise ValueError('replay: expected %r at event %d, got %r'%(
+                    _decode(ev), self.index, data))
+            pass
+        self.index += 1
+        if self.timing == 'original':
+            time.sleep(ev['e'])
+            pass
+        if 'err' in ev:
+            if ev['err'] in ('timeout', 'TimeoutError'):
+                raise socket.timeout(ev['msg'])
+            raise IOError('%s: %s'%(ev['err'], ev['msg']))
+        return ev
+
+    @communicator.instrumented
+    def send(self, msg):
+        self._next('send', msg)
+        return
+
+    @communicator.instrumented
+    def send_raw(self, msg):
+        self._next('send_raw', msg)
+        return
+
+    @communicator.instrumented
+    def recv(self, byte=1024):
+        return _decode(self._next('recv'))
+
+    @communicator.instrumented
+    def readline(self):
+        return _decode(self._next('readline'))
+
+    @communicator.instrumented
+    def read_block(self, terminated=True, out=None):
+        ret = bytearray(_decode(self._next('read_block')))
+        if out is None: return ret
+        view = memoryview(out).cast('B')[:len(ret)]
+        view[:] = ret
+        return view
+
+    @communicator.instrumented
+    def read_blocks(self, num, terminated=True):
+        return _decode(self._next('read_blocks'))
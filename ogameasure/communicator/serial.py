@@ -1,3 +1,4 @@
+import socket
 import serial as pyserial
 from . import communicator
 
@@ -68,19 +69,38 @@ class serial(communicator.communicator):
         self.connection = False
         return
 
+    @communicator.instrumented
     def send(self, msg):
         if type(msg)==str: msg = msg.encode()
         self.ser.write(msg+self.terminator)
         return
 
+    @communicator.instrumented
     def recv(self, byte=1024):
         d = self.ser.read(byte)
         if d.isascii():
             return d.decode()
         return d
 
+    @communicator.instrumented
     def readline(self):
         d = self.ser.readline()
         if d.isascii():
             return d.decode()
         return d
+
+    def read_into(self, buffer):
+        view = memoryview(buffer).cast('B')
+        try:
+            n = 0
+            while n < len(view):
+                d = self.ser.read(len(view) - n)
+                if len(d) == 0:
+                    raise socket.timeout('timed out')
+                view[n:n + len(d)] = d
+                n += len(d)
+                continue
+        finally:
+            view.release()
+            pass
+        return
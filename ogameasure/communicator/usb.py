@@ -37,10 +37,12 @@ class usb(communicator.communicator):
             self.connection = False
         return
 
+    @communicator.instrumented
     def send(self, msg):
         self.ser.write(msg)
         return
 
+    @communicator.instrumented
     def recv(self, byte=1024):
         ret = self.ser.read(byte)
         return ret
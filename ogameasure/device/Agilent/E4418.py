@@ -1,5 +1,8 @@
 import time
+import numpy
 from ..SCPI import scpi
+from ..SCPI.errors import error_handler_base
+from .power_stream import power_stream
 
 # main class
 # ==========
@@ -12,9 +15,13 @@ class E4418(scpi.scpi_family):
     _scpi_enable = '*CLS *DDT *ESE *ESR? *IDN? *OPC *OPT? *RCL *RST *SAV ' +\
                    '*SRE *STB? *TST? *WAI'
     
+    # interval of the *ESR? polling (sec)
+    poll_interval = 0.02
+    # time of one reading without averaging, used by settle_time() (sec)
+    reading_time = 0.05
+    
     def _error_check(self):
-        err_num, err_msg = self.error_query()
-        error_handler.check(err_num, err_msg)
+        self._check_errors(error_handler)
         return
     
     def error_query(self):
@@ -55,7 +62,7 @@ class E4418(scpi.scpi_family):
         err_msg = ret[1].strip('"')
         return err_num, err_msg
         
-    def zeroing(self, ch=1):
+    def zeroing(self, ch=1, timeout=30, wait=None):
         """
         CALn:ZERO:AUTO : Zeroing
         ------------------------
@@ -76,6 +83,14 @@ class E4418(scpi.scpi_family):
             Specify the channel to perform a zeroing. (1, 2)
             default = 1
         
+        < timeout : float :  >
+            Maximum time to wait for the end of the zeroing (sec).
+            default = 30
+        
+        < wait : float :  >
+            If given, sleep <wait> seconds instead of polling the operation
+            complete bit (e.g. wait=10).
+        
         Returns
         =======
         Nothing.
@@ -85,13 +100,20 @@ class E4418(scpi.scpi_family):
         >>> p.zeroing()
         >>> p.zeroing(ch=2)
         """
-        self.com.send('CAL%d:ZERO:AUTO ONCE'%(ch))
-        self._error_check()
-        time.sleep(10)
+        if wait is not None:
+            self.com.send('CAL%d:ZERO:AUTO ONCE'%(ch))
+            self._error_check()
+            time.sleep(wait)
+            self._error_check()
+            return
+        # *ESR? clears the operation complete bit of the former commands
+        self.com.send('*ESR?;:CAL%d:ZERO:AUTO ONCE;*OPC'%(ch))
+        self.com.readline()
+        self.wait_complete(timeout)
         self._error_check()
         return
         
-    def measure(self, ch=1, unit='DEF', resolution='DEF', wait=7):
+    def measure(self, ch=1, unit='DEF', resolution='DEF', wait=None, timeout=60):
         """
         MEASn? : Measuring
         ------------------
@@ -114,6 +136,18 @@ class E4418(scpi.scpi_family):
             Specify the resolution of the returned value.
             default = 'DEF'
         
+        < wait : float :  >
+            If given, send MEASn? and sleep <wait> seconds before reading
+            the result (the former behavior, e.g. wait=7).
+        
+        < timeout : float :  >
+            Maximum time to wait for the result (sec).
+            default = 60
+        
+        Without <wait>, the measurement is initiated with *OPC, and the
+        result is fetched as soon as the operation complete bit of *ESR? is
+        set, i.e. the call takes as long as the averaging of the meter.
+        
         Returnes
         ========
         < power : float :  >
@@ -124,13 +158,293 @@ class E4418(scpi.scpi_family):
         >>> p.measure()
         >>> p.measure(ch=2)
         """
-        self.com.send('MEAS%d? %s, %s'%(ch, unit, resolution))
-        time.sleep(wait)
+        if wait is not None:
+            self.com.send('MEAS%d? %s, %s'%(ch, unit, resolution))
+            time.sleep(wait)
+            ret = self.com.readline()
+            self._error_check()
+            ret = float(ret.strip())
+            return ret
+        self.com.send('*ESR?;:ABOR%d;:CONF%d %s, %s;:INIT%d:IMM;*OPC'%(
+            ch, ch, unit, resolution, ch))
+        self.com.readline()
+        self.wait_complete(timeout)
+        return self.fetch(ch)
+    
+    def configure(self, ch=1, unit='DEF', resolution='DEF'):
+        """
+        CONFn : Configure
+        -----------------
+        This command sets the specified window's measurement function to single
+        channel with relative mode off, and sets the trigger system to make
+        one measurement on INITn (INITn:CONT OFF, TRIG:SOUR IMM).
+        
+        Args
+        ====
+        < ch : int : 1,2 >
+            default = 1
+        
+        < unit : str : 'DEF','dBm','W' >
+            default = 'DEF'
+        
+        < resolution : str, or int : 'DEF',1.0,0.1,0.01,0.001 >
+            default = 'DEF'
+        
+        Returnes
+        ========
+        Nothing.
+        
+        Examples
+        ========
+        >>> p.configure()
+        """
+        self.com.send('CONF%d %s, %s'%(ch, unit, resolution))
+        self._error_check()
+        return
+    
+    def initiate(self, ch=1):
+        """
+        INITn:IMM : Initiate
+        --------------------
+        This command sets the power meter in the wait for trigger state. When
+        the measurement is completed, the result can be read by fetch().
+        
+        Args
+        ====
+        < ch : int : 1,2 >
+            default = 1
+        
+        Returnes
+        ========
+        Nothing.
+        
+        Examples
+        ========
+        >>> p.initiate()
+        """
+        self.com.send('INIT%d:IMM'%(ch))
+        self._error_check()
+        return
+    
+    def abort(self, ch=1):
+        """
+        ABORn : Abort
+        -------------
+        This command removes the measurement from the wait for trigger state
+        and places it in the idle state.
+        
+        Args
+        ====
+        < ch : int : 1,2 >
+            default = 1
+        
+        Returnes
+        ========
+        Nothing.
+        
+        Examples
+        ========
+        >>> p.abort()
+        """
+        self.com.send('ABOR%d'%(ch))
+        self._error_check()
+        return
+    
+    def fetch(self, ch=1):
+        """
+        FETCn? : Fetch
+        --------------
+        This command returns the last valid measurement result. If the result
+        is not valid, the error -230, "Data corrupt or stale" occurs.
+        
+        Args
+        ====
+        < ch : int : 1,2 >
+            default = 1
+        
+        Returnes
+        ========
+        < power : float :  >
+            Measured power level in the unit configured.
+        
+        Examples
+        ========
+        >>> p.initiate()
+        >>> p.wait_complete()
+        >>> p.fetch()
+        -10.0
+        """
+        self.com.send('FETC%d?'%(ch))
         ret = self.com.readline()
         self._error_check()
         ret = float(ret.strip())
         return ret
     
+    def wait_complete(self, timeout=10):
+        """
+        *ESR? : Wait for Operation Complete
+        -----------------------------------
+        Poll the standard event status register until the operation complete
+        bit (set by a preceding *OPC) is set. The register is cleared by the
+        query, so query *ESR? once before the command and *OPC.
+        
+        Args
+        ====
+        < timeout : float :  >
+            Maximum time to wait (sec). TimeoutError is raised after this.
+            default = 10
+        
+        Returnes
+        ========
+        < esr : int :  >
+            The value of the register when the bit was set.
+        
+        Examples
+        ========
+        >>> p.com.send('*ESR?;:INIT1:IMM;*OPC')
+        >>> p.com.readline()
+        >>> p.wait_complete()
+        """
+        t0 = time.time()
+        while True:
+            self.com.send('*ESR?')
+            esr = int(self.com.readline())
+            if esr & 0x01: return esr
+            if time.time() - t0 > timeout:
+                msg = 'operation is not completed within %.1f sec'%(timeout)
+                raise TimeoutError(msg)
+            time.sleep(self.poll_interval)
+            continue
+        return
+    
+    def settle_time(self, ch=1):
+        """
+        (Helper Method) Estimate Settle Time
+        ------------------------------------
+        Estimate the time of one measurement from the averaging settings:
+        <reading_time> times the filter length (1 if averaging is off).
+        Use this as the <wait> of measure() if the operation complete bit
+        cannot be polled (e.g. through a communicator without responses to
+        *ESR?).
+        
+        Args
+        ====
+        < ch : int : 1,2 >
+            default = 1
+        
+        Returnes
+        ========
+        < settle_time : float : (sec) >
+        
+        Examples
+        ========
+        >>> p.average_count(64)
+        >>> p.measure(wait=p.settle_time())
+        """
+        count = 1
+        if self.average_on_off_query(ch):
+            count = self.average_count_query(ch)
+            pass
+        return self.reading_time * count + self.poll_interval
+    
+    def continuous_set(self, on_off, ch=1):
+        """
+        INITn:CONT : Set Continuous Trigger
+        -----------------------------------
+        This command sets the power meter for either a single trigger cycle
+        or continuous trigger cycles.
+        
+        Args
+        ====
+        < on_off : int : 1,0 >
+            1 = continuous trigger cycles, 0 = single trigger cycle.
+        
+        < ch : int : 1,2 >
+            default = 1
+        
+        Returnes
+        ========
+        Nothing.
+        
+        Examples
+        ========
+        >>> p.continuous_set(1)
+        """
+        self.com.send('INIT%d:CONT %d'%(ch, on_off))
+        self._error_check()
+        return
+    
+    def continuous_query(self, ch=1):
+        """
+        INITn:CONT? : Query Continuous Trigger
+        --------------------------------------
+        
+        Args
+        ====
+        < ch : int : 1,2 >
+            default = 1
+        
+        Returnes
+        ========
+        < on_off : int : 1,0 >
+        
+        Examples
+        ========
+        >>> p.continuous_query()
+        0
+        """
+        self.com.send('INIT%d:CONT?'%(ch))
+        ret = self.com.readline()
+        self._error_check()
+        ret = int(ret)
+        return ret
+    
+    def stream(self, n=None, ch=1, depth=10000, unit='DEF', resolution='DEF',
+               callback=None, timeout=60):
+        """
+        Stream Readings
+        ---------------
+        Take readings back to back, each from a new measurement (INITn:IMM
+        and *OPC), with the configuration and the next initiation sent with
+        the fetch instead of once per measure().
+        See power_stream for the details.
+        
+        Args
+        ====
+        < n : int :  >
+            Number of readings. None = endless.
+        
+        < ch : int : 1,2 >
+            default = 1
+        
+        < depth : int :  >
+            Number of readings kept in the buffer.
+        
+        < unit : str : 'DEF','dBm','W' >
+        
+        < resolution : str, or int : 'DEF',1.0,0.1,0.01,0.001 >
+        
+        < callback : function :  >
+            Called as callback(timestamp, value) for each reading.
+        
+        < timeout : float :  >
+            Maximum time to wait for each measurement (sec).
+            default = 60
+        
+        Returnes
+        ========
+        < stream : power_stream :  >
+            Iterator of (timestamp, value). Use stream.run() to take all.
+        
+        Examples
+        ========
+        >>> t, v = p.stream(n=1000).run()
+        >>> v.std()
+        0.0021
+        """
+        return power_stream(self, n, ch, depth, unit, resolution, callback,
+                            timeout)
+    
     def average_on_off(self, on_off, ch=1):
         """
         SENSn:AVER : Set Average ON/OFF
@@ -260,16 +574,102 @@ class E4418(scpi.scpi_family):
     
         
     
+class E4419(E4418):
+    product_name = 'E4419'
+    
+    def acquire_dual(self, n=1, unit='DEF', resolution='DEF', calc=None,
+                     timeout=60):
+        """
+        FETC1?;FETC2? : Dual Channel Acquisition
+        ----------------------------------------
+        Configure both channels, and take <n> samples. Each sample is a new
+        measurement of both channels (INIT1:IMM;INIT2:IMM;*OPC), waited for
+        with wait_complete(), and the channel A and B are read with one
+        program message, which also initiates the next measurement.
+        The continuous trigger settings are restored at the end.
+        
+        Args
+        ====
+        < n : int :  >
+            Number of samples.
+            default = 1
+        
+        < unit : str : 'DEF','dBm','W' >
+            default = 'DEF'
+        
+        < resolution : str, or int : 'DEF',1.0,0.1,0.01,0.001 >
+            default = 'DEF'
+        
+        < calc : str : None,'ratio','difference' >
+            Also return A/B or A-B of each sample. 'ratio' needs
+            <unit>='W'. With <unit>='dBm', 'difference' is the ratio in dB.
+            default = None
+        
+        < timeout : float :  >
+            Maximum time to wait for each measurement (sec).
+            default = 60
+        
+        Returnes
+        ========
+        < power : numpy.ndarray : (n, 2) >
+            Readings of the channel A and B.
+        
+        < calc : numpy.ndarray : (n,) >
+            Only if <calc> is given.
+        
+        Examples
+        ========
+        >>> p.acquire_dual(100).mean(axis=0)
+        array([-10.01, -20.02])
+        
+        >>> power, diff = p.acquire_dual(100, unit='dBm', calc='difference')
+        """
+        if calc not in (None, 'ratio', 'difference'):
+            raise ValueError("calc must be None, 'ratio' or 'difference'")
+        if calc == 'ratio' and unit != 'W':
+            raise ValueError("calc='ratio' needs unit='W' "
+                             "(use 'difference' with unit='dBm')")
+        cont = [self.continuous_query(ch) for ch in (1, 2)]
+        trigger = 'INIT1:IMM;:INIT2:IMM;*OPC'
+        self.com.send(('ABOR1;:ABOR2;:CONF1 %s, %s;:CONF2 %s, %s;' +
+                       ':INIT1:CONT OFF;:INIT2:CONT OFF')%(
+                           unit, resolution, unit, resolution))
+        self._error_check()
+        data = numpy.empty((n, 2))
+        try:
+            self.com.send('*ESR?;:' + trigger)
+            self.com.readline()
+            for i in range(n):
+                self.wait_complete(timeout)
+                if i < n - 1:
+                    self.com.send('FETC1?;:FETC2?;*ESR?;:' + trigger)
+                else:
+                    self.com.send('FETC1?;:FETC2?')
+                    pass
+                ret = self.com.readline().split(';')
+                data[i, 0] = float(ret[0])
+                data[i, 1] = float(ret[1])
+                continue
+        finally:
+            self.com.send('ABOR1;:ABOR2;:INIT1:CONT %d;:INIT2:CONT %d'%(
+                cont[0], cont[1]))
+            self._error_check()
+            pass
+        if calc is None: return data
+        if calc == 'ratio': return data, data[:, 0] / data[:, 1]
+        return data, data[:, 0] - data[:, 1]
+
+
 class EPM441A(E4418):
     product_name = 'EPM-441A'
 
-class EPM442A(E4418):
+class EPM442A(E4419):
     product_name = 'EPM-442A'
 
 class E4418B(E4418):
     product_name = 'E4418B'
 
-class E4419B(E4418):
+class E4419B(E4419):
     product_name = 'E4419B'
 
 
@@ -292,7 +692,8 @@ class error_item(object):
         self.txt = txt
         pass
 
-class error_handler(object):
+class error_handler(error_handler_base):
+    label = 'Power meter'
     error_list = [
         error_item(0, 'No error', ''),
         error_item(-101, 'Invalid character', 'An invalid character was found in the command string. You may have inserted a character such as #, $ or % in the command header or within a parameter. For example, LIM:LOW O#.'),
@@ -362,25 +763,4 @@ class error_handler(object):
         error_item(-430, 'Query DEADLOCKED', 'A command was received which generates too much data to fit in the output buffer and the input buffer is also full. Command execution continues but data is lost. -440 Query UNTERMINATED after indefinite response The *IDN? command must be the last query command within a command string.'),
     ]
     
-    @classmethod
-    def check(cls, num, msg):
-        if num==0: return
-        for e in cls.error_list:
-            if msg == e.msg:
-                emsg = '%s (%d)'%(e.msg, e.num)
-                msg = 'Power meter returned Error message.\n'
-                msg += '*'*len(emsg) + '\n'
-                msg += emsg + '\n'
-                msg += '*'*len(emsg) + '\n'
-                msg += e.txt + '\n'
-                raise StandardError(msg)
-            continue
-        _msg = 'Power meter returned Error message.\n'
-        emsg = '%s (%d)\n'%(msg, num)
-        _msg += '*'*len(emsg) + '\n'
-        _msg += emsg
-        _msg += '*'*len(emsg) + '\n'
-        raise StandardError(_msg)
-        return
-    
     
@@ -1,5 +1,6 @@
 import time
 from ..SCPI import scpi
+from ..SCPI.errors import error_handler_base
 
 # main class
 # ==========
@@ -11,6 +12,15 @@ class E8247(scpi.scpi_family):
     
     _scpi_enable = '*CLS *ESE *ESE? *ESR? *IDN? *OPC *OPC? *PSC? *RCL ' +\
                    '*RST *SAV *SRE *SRE? *STB? *TST? *WAI'
+
+    # settings for cache_enable()
+    _cached_settings = {
+        'freq_set': 'freq_query',
+        'power_set': 'power_query',
+        'output_set': 'output_query',
+        'output_on': 'output_query',
+        'output_off': 'output_query',
+    }
     
     def _error_check(self):
         #err_num, err_msg = self.error_query()
@@ -246,28 +256,8 @@ class error_item(object):
         self.txt = txt
         pass
 
-class error_handler(object):
+class error_handler(error_handler_base):
+    label = 'Signal Generator'
     error_list = []
     
-    @classmethod
-    def check(cls, num, msg):
-        if num==0: return
-        for e in cls.error_list:
-            if msg == e.msg:
-                emsg = '%s (%d)'%(e.msg, e.num)
-                msg = 'Signal Generator returned Error message.\n'
-                msg += '*'*len(emsg) + '\n'
-                msg += emsg + '\n'
-                msg += '*'*len(emsg) + '\n'
-                msg += e.txt + '\n'
-                raise StandardError(msg)
-            continue
-        _msg = 'Signal Generator returned Error message.\n'
-        emsg = '%s (%d)\n'%(msg, num)
-        _msg += '*'*len(emsg) + '\n'
-        _msg += emsg
-        _msg += '*'*len(emsg) + '\n'
-        raise StandardError(_msg)
-        return
-    
     
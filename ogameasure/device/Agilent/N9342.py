@@ -1,22 +1,55 @@
 import time
 import datetime
-import numpy
 from ..SCPI import scpi
+from ..SCPI.errors import error_handler_base
+from .spectrum_analyzer import spectrum_analyzer
 
 # main class
 # ==========
 
-class N9342(scpi.scpi_family):
+class N9342(spectrum_analyzer, scpi.scpi_family):
     manufacturer = 'Agilent'
     product_name = 'N9342'
     classification = 'Spectrum Analyzer'
     
     _scpi_enable = '*CLS *ESE *ESR? *IDN? *OPC *OPT? *RST ' +\
                    '*SRE *STB? *TST? *WAI'
+
+    _trace_query = 'TRACE:DATA? TRACE%d'
+
+    # settings for cache_enable()
+    _cached_settings = {
+        'frequency_center_set': ('frequency_center_query', 'frequency_start_query',
+                                 'frequency_stop_query', 'frequency_center_ch_query'),
+        'frequency_center_ch_set': ('frequency_center_ch_query', 'frequency_center_query',
+                                    'frequency_start_query', 'frequency_stop_query'),
+        'frequency_start_set': ('frequency_start_query', 'frequency_stop_query',
+                                'frequency_center_query', 'frequency_span_query',
+                                'frequency_center_ch_query'),
+        'frequency_stop_set': ('frequency_stop_query', 'frequency_start_query',
+                               'frequency_center_query', 'frequency_span_query',
+                               'frequency_center_ch_query'),
+        'frequency_span_set': ('frequency_span_query', 'frequency_start_query',
+                               'frequency_stop_query'),
+        'reference_level_set': 'reference_level_query',
+        'attenuation_set': ('attenuation_query', 'attenuation_auto_query'),
+        'attenuation_auto_set': ('attenuation_auto_query', 'attenuation_query'),
+        'scalediv_set': 'scalediv_query',
+        'scaletype_set': 'scaletype_query',
+        'resolution_bw_set': ('resolution_bw_query', 'resolution_bw_auto_query',
+                              'sweep_time_query'),
+        'resolution_bw_auto_set': ('resolution_bw_auto_query', 'resolution_bw_query',
+                                   'sweep_time_query'),
+        'video_bw_set': ('video_bw_query', 'video_bw_auto_query', 'sweep_time_query'),
+        'video_bw_auto_set': ('video_bw_auto_query', 'video_bw_query', 'sweep_time_query'),
+        'average_set': 'average_query',
+        'average_onoff_set': 'average_onoff_query',
+        'sweep_time_set': 'sweep_time_query',
+        'sweep_continuous_set': 'sweep_continuous_query',
+    }
     
     def _error_check(self):
-        err_num, err_msg = self.error_query()
-        error_handler.check(err_num, err_msg)
+        self._check_errors(error_handler)
         return
     
     def error_query(self):
@@ -262,32 +295,10 @@ class N9342(scpi.scpi_family):
         timestamp = datetime.datetime.strptime(ret, fmt)
         return timestamp
 
-    def trace_data_query(self, ch=1):
-        """
-        TRAC? : Query Trace Data
-        ------------------------
-        This query command returns the current displayed data.
-        
-        Args
-        ====
-        < ch : int : 1-4 >
-        
-        Returns
-        =======
-        < data : list(float) :  >
-            A list of the data that are displayed.
-                
-        Examples
-        ========
-        >>> s.trace_data_query()
-        array([  4.156894, -52.79362, ... , -43.07858, -41.12521 ])
-        """
-        self.com.send('TRACE:DATA? TRACE%d'%(ch))
-        ret = self.com.readline()
-        self._error_check()
-        ret = numpy.array(ret.strip().split(','), float)
-        return ret
-        
+    def _sweep_points(self):
+        # no SWE:POIN? on N9342: the number of points is that of a trace
+        return len(self.trace_data_query())
+
     def frequency_center_set(self, freq, unit='GHz'):
         """
         FREQ:CENT : Set Center Frequency
@@ -319,6 +330,7 @@ class N9342(scpi.scpi_family):
         freq = freq_value(freq, unit)
         self.com.send('FREQ:CENT %s'%(freq.query))
         self._error_check()
+        self._sweep_update(start=None, stop=None)
         return
         
     def frequency_center_query(self):
@@ -368,6 +380,7 @@ class N9342(scpi.scpi_family):
         """
         self.com.send('FREQ:CENT:CHAN %d'%(ch))
         self._error_check()
+        self._sweep_update(start=None, stop=None)
         return
         
     def frequency_center_ch_query(self):
@@ -427,6 +440,7 @@ class N9342(scpi.scpi_family):
         freq = freq_value(freq, unit)
         self.com.send('FREQ:STAR %s'%(freq.query))
         self._error_check()
+        self._sweep_update(start=freq.hz)
         return
         
     def frequency_start_query(self):
@@ -453,6 +467,7 @@ class N9342(scpi.scpi_family):
         ret = self.com.readline()
         self._error_check()
         ret = float(ret)
+        self._sweep_update(start=ret)
         return ret
     
     def frequency_stop_set(self, freq, unit='GHz'):
@@ -486,6 +501,7 @@ class N9342(scpi.scpi_family):
         freq = freq_value(freq, unit)
         self.com.send('FREQ:STOP %s'%(freq.query))
         self._error_check()
+        self._sweep_update(stop=freq.hz)
         return
         
     def frequency_stop_query(self):
@@ -512,6 +528,7 @@ class N9342(scpi.scpi_family):
         ret = self.com.readline()
         self._error_check()
         ret = float(ret)
+        self._sweep_update(stop=ret)
         return ret
     
     def frequency_span_set(self, freq, unit='GHz'):
@@ -546,6 +563,7 @@ class N9342(scpi.scpi_family):
         freq = freq_value(freq, unit)
         self.com.send('FREQ:SPAN %s'%(freq.query))
         self._error_check()
+        self._sweep_update(start=None, stop=None)
         return
         
     def frequency_span_query(self):
@@ -1242,13 +1260,6 @@ g        Returns
         self._error_check()
         ret = float(ret)
         return ret
-            
-    def gen_xaxis(self):
-        start = self.frequency_start_query()
-        stop = self.frequency_stop_query()
-        num = len(self.trace_data_query())
-        xaxis = numpy.linspace(start, stop, num)
-        return xaxis
 
 
 
@@ -1279,8 +1290,14 @@ class freq_value(object):
             self.value = float(value)
             pass
         self.query = '%.10f %s'%(self.value, self.unit)
+        self.hz = None
+        if self.unit.lower() in self._factor:
+            self.hz = self.value * self._factor[self.unit.lower()]
+            pass
         pass
 
+    _factor = {'': 1., 'hz': 1., 'khz': 1e3, 'mhz': 1e6, 'ghz': 1e9}
+
 
 # Error Class
 # ===========
@@ -1295,7 +1312,8 @@ class error_item(object):
         self.txt = txt
         pass
 
-class error_handler(object):
+class error_handler(error_handler_base):
+    label = 'Power meter'
     error_list = [
         error_item(0, 'No error', ''),
         error_item(-410, 'Query INTERRUPTED', 'Indicates that a condition causing an INTERRUPTED query occurred (see IEEE 488.2, 6.3.2.7)'),
@@ -1332,26 +1350,5 @@ class error_handler(object):
         error_item(116, 'Cannotcommunicate with RF', 'IndicatestheMCUcannotfindtheRF board.'),
     ]
     
-    @classmethod
-    def check(cls, num, msg):
-        if num==0: return
-        for e in cls.error_list:
-            if msg == e.msg:
-                emsg = '%s (%d)'%(e.msg, e.num)
-                msg = 'Power meter returned Error message.\n'
-                msg += '*'*len(emsg) + '\n'
-                msg += emsg + '\n'
-                msg += '*'*len(emsg) + '\n'
-                msg += e.txt + '\n'
-                raise StandardError(msg)
-            continue
-        _msg = 'Power meter returned Error message.\n'
-        emsg = '%s (%d)\n'%(msg, num)
-        _msg += '*'*len(emsg) + '\n'
-        _msg += emsg
-        _msg += '*'*len(emsg) + '\n'
-        raise StandardError(_msg)
-        return
-    
     
 
@@ -0,0 +1,151 @@
+import time
+import numpy
+
+
+class power_stream(object):
+    """
+    Continuous readings of a power meter into a ring buffer.
+
+    Made by E4418.stream(). The channel is configured once for the single
+    trigger cycle, and each measurement is initiated by 'INITn:IMM;*OPC'.
+    The end of the measurement is detected by E4418.wait_complete()
+    (polling *ESR? every <poll_interval>), and the reading is fetched with
+    the initiation of the next measurement in one program message
+    ('FETCn?;*ESR?;:INITn:IMM;*OPC'), so that each reading is a new
+    measurement and the meter keeps measuring while the reading is handled.
+
+    The readings are written to <values> (float64) and the times
+    (time.monotonic(), at the middle of the measurement) to <timestamps>,
+    both of length <depth>. Iteration yields (timestamp, value).
+
+    The errors are checked at the start and at the close only. The former
+    continuous trigger setting is restored at the close. KeyboardInterrupt
+    stops run() with n=None, and is raised again otherwise.
+
+    Examples
+    ========
+    >>> with p.stream(n=1000) as st:
+    ...     t, v = st.run()
+    >>> for t, v in p.stream(n=10):
+    ...     print(t, v)
+    """
+
+    def __init__(self, pm, n=None, ch=1, depth=10000, unit='DEF',
+                 resolution='DEF', callback=None, timeout=60):
+        self.pm = pm
+        self.n = n
+        self.ch = ch
+        self.unit = unit
+        self.resolution = resolution
+        self.callback = callback
+        self.timeout = timeout
+        if n is not None: depth = min(depth, n)
+        self.depth = depth
+        self.values = numpy.full(depth, numpy.nan)
+        self.timestamps = numpy.full(depth, numpy.nan)
+        self.count = 0
+        self._cont = None
+        self._trigger = 'INIT%d:IMM;*OPC'%(ch)
+        self._query = 'FETC%d?;*ESR?;:'%(ch) + self._trigger
+        self._t_init = None
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        return
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.n is not None and self.count >= self.n:
+            self.close()
+            raise StopIteration
+        return self.acquire()
+
+    def start(self):
+        if self._cont is None:
+            pm = self.pm
+            self._cont = pm.continuous_query(self.ch)
+            pm.com.send('ABOR%d;:CONF%d %s, %s;:INIT%d:CONT OFF'%(
+                self.ch, self.ch, self.unit, self.resolution, self.ch))
+            pm._error_check()
+            pm.com.send('*ESR?;:' + self._trigger)
+            pm.com.readline()
+            self._t_init = time.monotonic()
+            pass
+        return
+
+    def close(self):
+        """Abort the measurement, and restore the continuous trigger setting."""
+        if self._cont is not None:
+            self.pm.com.send('ABOR%d'%(self.ch))
+            self.pm.continuous_set(self._cont, self.ch)
+            self._cont = None
+            pass
+        return
+
+    def acquire(self):
+        """Take one reading into the buffer and return (timestamp, value)."""
+        self.start()
+        pm = self.pm
+        pm.wait_complete(self.timeout)
+        t = (self._t_init + time.monotonic()) / 2
+        pm.com.send(self._query)
+        self._t_init = time.monotonic()
+        v = float(pm.com.readline().split(';')[0])
+        i = self.count % self.depth
+        self.values[i] = v
+        self.timestamps[i] = t
+        self.count += 1
+        if self.callback is not None:
+            self.callback(t, v)
+            pass
+        return t, v
+
+    def run(self):
+        """
+        Take the readings until <n> (or until KeyboardInterrupt if n=None).
+        The continuous trigger setting is restored also on KeyboardInterrupt,
+        which is raised again if <n> is given.
+
+        Returns
+        =======
+        < timestamps : numpy.ndarray : (filled,) >
+        < values : numpy.ndarray : (filled,) >
+        """
+        try:
+            while self.n is None or self.count < self.n:
+                self.acquire()
+                continue
+        except KeyboardInterrupt:
+            if self.n is not None: raise
+            pass
+        finally:
+            self.close()
+            pass
+        return self.data()
+
+    # buffer
+    # ------
+    @property
+    def filled(self):
+        return min(self.count, self.depth)
+
+    def data(self):
+        """Timestamps and values in the buffer from the oldest."""
+        if self.count <= self.depth:
+            order = numpy.arange(self.count)
+        else:
+            order = (numpy.arange(self.depth) + self.count) % self.depth
+            pass
+        return self.timestamps[order], self.values[order]
+
+    def rate(self):
+        """Readings per second in the buffer."""
+        t, _ = self.data()
+        if len(t) < 2: return numpy.nan
+        return (len(t) - 1) / (t[-1] - t[0])
@@ -0,0 +1,387 @@
+import functools
+import numpy
+from .sweep_plan import sweep_plan
+from .trace_stream import trace_stream
+
+
+class spectrum_analyzer(object):
+    """
+    Trace transfer and sweep helpers shared by the Agilent spectrum
+    analyzer drivers (N9938A, N9342). Mix in before scpi.scpi_family.
+
+    The drivers give the trace query header in <_trace_query>, and the
+    frequency setters/queries keep the sweep geometry cache up to date
+    with _sweep_update().
+    """
+
+    # trace query of a channel (see trace_data_query)
+    _trace_query = 'TRAC%d:DATA?'
+
+    # binary trace transfer (see trace_data_query)
+    binary = False
+    _trace_format_binary = 'FORM:DATA REAL,32;:FORM:BORD SWAP;:'
+    _trace_format_ascii = 'FORM:DATA ASC;:'
+    _trace_dtype = '<f4'
+    _binary_format = False
+
+    # sweep geometry cache (see gen_xaxis), cleared by these methods
+    _sweep = None
+    _xaxis = None
+    _sweep_reset_methods = ('scpi_reset', 'RST', 'scpi_recall', 'RCL')
+
+    def _add_scpi_methods(self):
+        super()._add_scpi_methods()
+        for name in self._sweep_reset_methods:
+            if name not in self.__dict__: continue
+            self.__setattr__(name, self._sweep_reset(self.__dict__[name]))
+            continue
+        return
+
+    def _sweep_reset(self, func):
+        @functools.wraps(func)
+        def reset(*args, **kwargs):
+            self.sweep_cache_clear()
+            return func(*args, **kwargs)
+        return reset
+
+    def trace_data_query(self, ch=1, binary=None, out=None):
+        """
+        TRAC? : Query Trace Data
+        ------------------------
+        This query command returns the current displayed data.
+
+        With <binary>=True, the trace is transferred as a REAL,32 binary
+        block (FORM:DATA REAL,32, FORM:BORD SWAP) instead of ASCII, which is
+        several times smaller and needs no parsing.
+
+        Args
+        ====
+        < ch : int : 1-4 >
+
+        < binary : bool :  >
+            Use the binary transfer. default = <self.binary>
+
+        < out : numpy.ndarray :  >
+            Binary transfer only. Read the trace directly into this float32
+            array (e.g. a row of a ring buffer) instead of a new one.
+
+        Returns
+        =======
+        < data : numpy.ndarray :  >
+            The data that are displayed. float32 if binary, else float64.
+
+        Examples
+        ========
+        >>> s.trace_data_query()
+        array([  4.156894, -52.79362, ... , -43.07858, -41.12521 ])
+        >>> s.trace_data_query(binary=True)
+        array([  4.156894, -52.79362, ... , -43.07858, -41.12521 ], dtype=float32)
+        """
+        if binary is None: binary = self.binary
+        if binary:
+            self.com.send(self._trace_format_binary + self._trace_query%(ch))
+            ret = self.com.read_block_array(self._trace_dtype, out=out)
+            self._binary_format = True
+            self._error_check()
+            self._sweep_update(points=len(ret))
+            return ret
+        if self._binary_format:
+            self.com.send(self._trace_format_ascii + self._trace_query%(ch))
+            self._binary_format = False
+        else:
+            self.com.send(self._trace_query%(ch))
+            pass
+        ret = self.com.readline()
+        self._error_check()
+        ret = numpy.array(ret.strip().split(','), float)
+        self._sweep_update(points=len(ret))
+        return ret
+
+    def trace_data_query_many(self, chs=(1, 2, 3, 4), binary=None):
+        """
+        TRAC? : Query Several Traces
+        ----------------------------
+        Query several traces in one program message
+        (e.g. 'TRAC1:DATA?;:TRAC2:DATA?'), and return them stacked.
+
+        Args
+        ====
+        < chs : list(int) : 1-4 >
+
+        < binary : bool :  >
+            See trace_data_query().
+
+        Returns
+        =======
+        < data : numpy.ndarray : (len(chs), points) >
+
+        Examples
+        ========
+        >>> clrw, maxh, avg, minh = s.trace_data_query_many([1, 2, 3, 4])
+        """
+        if binary is None: binary = self.binary
+        msg = ';:'.join(self._trace_query%(ch) for ch in chs)
+        if binary:
+            self.com.send(self._trace_format_binary + msg)
+            blocks = self.com.read_blocks(len(chs))
+            self._binary_format = True
+            self._error_check()
+            ret = numpy.vstack([numpy.frombuffer(b, self._trace_dtype) for b in blocks])
+            self._sweep_update(points=ret.shape[1])
+            return ret
+        if self._binary_format:
+            self.com.send(self._trace_format_ascii + msg)
+            self._binary_format = False
+        else:
+            self.com.send(msg)
+            pass
+        ret = self.com.readline()
+        self._error_check()
+        ret = numpy.array([r.split(',') for r in ret.strip().split(';')], float)
+        self._sweep_update(points=ret.shape[1])
+        return ret
+
+    def sweep_continuous_set(self, on_off):
+        """
+        INIT:CONT : Set Continuous Sweep
+        --------------------------------
+        Set the sweep mode to continuous (1) or single (0).
+
+        Args
+        ====
+        < on_off : int : 1,0 >
+
+        Returns
+        =======
+        Nothing.
+
+        Examples
+        ========
+        >>> s.sweep_continuous_set(0)
+        """
+        self.com.send('INIT:CONT %d'%(on_off))
+        self._error_check()
+        return
+
+    def sweep_continuous_query(self):
+        """
+        INIT:CONT? : Query Continuous Sweep
+        -----------------------------------
+        Query the sweep mode.
+
+        Args
+        ====
+        Nothing.
+
+        Returns
+        =======
+        < on_off : int : 1,0 >
+            1 = continuous, 0 = single
+
+        Examples
+        ========
+        >>> s.sweep_continuous_query()
+        1
+        """
+        self.com.send('INIT:CONT?')
+        ret = self.com.readline()
+        self._error_check()
+        ret = int(ret)
+        return ret
+
+    def sweep_single(self):
+        """
+        INIT:IMM;*OPC? : Single Sweep
+        -----------------------------
+        Start a sweep and wait for its completion.
+        Use with sweep_continuous_set(0).
+
+        Args
+        ====
+        Nothing.
+
+        Returns
+        =======
+        Nothing.
+
+        Examples
+        ========
+        >>> s.sweep_single()
+        """
+        self.com.send('INIT:IMM;*OPC?')
+        self.com.readline()
+        return
+
+    def stream_traces(self, n=None, ch=1, depth=100, binary=None):
+        """
+        Stream Traces
+        -------------
+        Take single sweeps back to back into a ring buffer.
+        See trace_stream for the details.
+
+        Args
+        ====
+        < n : int :  >
+            Number of traces. None = endless.
+
+        < ch : int : 1-4 >
+
+        < depth : int :  >
+            Number of traces kept in the ring buffer.
+
+        < binary : bool :  >
+            See trace_data_query().
+
+        Returns
+        =======
+        < stream : trace_stream :  >
+            Iterator of the traces (views of the ring buffer rows).
+
+        Examples
+        ========
+        >>> for trace in s.stream_traces(n=10):
+        ...     print(trace.argmax())
+        """
+        return trace_stream(self, n, ch, depth, binary)
+
+    def sweep_plan(self, start, stop, rbw, points=None, bins_per_rbw=2.):
+        """
+        Plan a Segmented Sweep
+        ----------------------
+        Plan a sweep wider than one trace at a fine RBW. The span is split
+        into segments whose frequency step is <= <rbw>/<bins_per_rbw>.
+        See sweep_plan for the details.
+
+        Args
+        ====
+        < start : float : (Hz) >
+
+        < stop : float : (Hz) >
+
+        < rbw : float : (Hz) >
+            Resolution bandwidth.
+
+        < points : int :  >
+            Number of points of a segment. default = the current setting.
+
+        < bins_per_rbw : float :  >
+            Number of points per RBW.
+
+        Returns
+        =======
+        < plan : sweep_plan :  >
+            Use plan.run() to execute it.
+
+        Examples
+        ========
+        >>> x, y = s.sweep_plan(1e9, 2e9, 10e3).run()
+        """
+        if points is None:
+            self.gen_xaxis()
+            points = self._sweep['points']
+            pass
+        return sweep_plan(self, start, stop, rbw, points, bins_per_rbw)
+
+    def gen_xaxis(self):
+        """
+        Generate Frequency Axis
+        -----------------------
+        Return the frequency of each point of the trace.
+
+        The start/stop frequencies and the number of points are taken from
+        the sweep geometry cache, which is filled by the frequency setters,
+        queries and trace queries, and cleared by the center/span/channel
+        setters. Only missing values are queried (FREQ:STAR?, FREQ:STOP?,
+        and see _sweep_points()). The returned array is shared between the calls
+        with the same geometry, and is read-only.
+
+        Args
+        ====
+        Nothing.
+
+        Returns
+        =======
+        < xaxis : numpy.ndarray : (Hz) >
+
+        Examples
+        ========
+        >>> s.gen_xaxis()
+        array([0.00000e+00, 7.50000e+06, ... , 3.00000e+09])
+        """
+        if self._sweep is None: self._sweep = {}
+        if 'start' not in self._sweep:
+            self.frequency_start_query()
+            pass
+        if 'stop' not in self._sweep:
+            self.frequency_stop_query()
+            pass
+        if 'points' not in self._sweep:
+            self._sweep_points()
+            pass
+        key = (self._sweep['start'], self._sweep['stop'], self._sweep['points'])
+        if self._xaxis is None or self._xaxis[0] != key:
+            xaxis = numpy.linspace(*key)
+            xaxis.flags.writeable = False
+            self._xaxis = (key, xaxis)
+            pass
+        return self._xaxis[1]
+
+    def trace_with_xaxis(self, ch=1, binary=None):
+        """
+        Query Trace Data with Frequency Axis
+        ------------------------------------
+        Query a trace and return it with its frequency axis. No query is
+        made for the axis when the sweep geometry is cached.
+
+        Args
+        ====
+        < ch : int : 1-4 >
+
+        < binary : bool :  >
+            See trace_data_query().
+
+        Returns
+        =======
+        < xaxis : numpy.ndarray : (Hz) >
+
+        < data : numpy.ndarray :  >
+
+        Examples
+        ========
+        >>> x, y = s.trace_with_xaxis()
+        """
+        data = self.trace_data_query(ch, binary)
+        xaxis = self.gen_xaxis()
+        return xaxis, data
+
+    def sweep_cache_clear(self):
+        """
+        Clear the sweep geometry cache, e.g. after the settings are changed
+        from the front panel.
+        """
+        self._sweep = {}
+        self._xaxis = None
+        return
+
+    def _sweep_update(self, **kwargs):
+        # None = unknown. A start (stop) beyond the cached stop (start)
+        # moves the other one on the instrument.
+        if self._sweep is None: self._sweep = {}
+        for key, value in kwargs.items():
+            if value is None:
+                self._sweep.pop(key, None)
+            else:
+                self._sweep[key] = value
+                pass
+            continue
+        start = self._sweep.get('start')
+        stop = self._sweep.get('stop')
+        if start is not None and stop is not None and start >= stop:
+            self._sweep.pop('stop' if 'start' in kwargs else 'start', None)
+            pass
+        return
+
+    def _sweep_points(self):
+        # query the number of points (and cache it)
+        return self.sweep_points_query()
+
@@ -0,0 +1,119 @@
+import math
+import numpy
+
+
+def plan_segments(start, stop, rbw, points, bins_per_rbw=2.):
+    """
+    Split [<start>, <stop>] (Hz) into segments of equal span, so that the
+    frequency step of a segment of <points> points is not larger than
+    <rbw> / <bins_per_rbw>. Adjacent segments share their edge frequency.
+
+    Returns
+    =======
+    < segments : list of (start, stop) >
+    """
+    if stop <= start:
+        raise ValueError('stop (%g) must be larger than start (%g)'%(stop, start))
+    max_span = rbw / bins_per_rbw * (points - 1)
+    num = max(int(math.ceil((stop - start) / max_span - 1e-9)), 1)
+    edges = numpy.linspace(start, stop, num + 1)
+    return [(edges[i], edges[i + 1]) for i in range(num)]
+
+
+class sweep_plan(object):
+    """
+    Wideband sweep made of several segments, stitched into one spectrum.
+
+    Made by N9938A.sweep_plan() / N9342.sweep_plan(). For each segment,
+    the start/stop frequencies and a single sweep ('INIT:IMM;*OPC?') are
+    sent as one program message, followed by a trace query. The RBW (and
+    the number of points, if the analyzer supports it) are set once, and
+    the continuous sweep setting is restored at the end.
+
+    < segments : list of (start, stop) >
+
+    < xaxis : numpy.ndarray >
+        Frequency axis of the stitched spectrum.
+
+    Examples
+    ========
+    >>> plan = s.sweep_plan(1e9, 6e9, rbw=100e3, points=1001)
+    >>> len(plan.segments)
+    100
+    >>> x, y = plan.run(callback=lambda i, n, x, y: print(i, n))
+    """
+
+    def __init__(self, sa, start, stop, rbw, points, bins_per_rbw=2.):
+        self.sa = sa
+        self.rbw = rbw
+        self.points = points
+        self.segments = plan_segments(start, stop, rbw, points, bins_per_rbw)
+        self.step = points - 1
+        self.xaxis = numpy.linspace(start, stop, len(self.segments) * self.step + 1)
+        pass
+
+    def __len__(self):
+        return len(self.segments)
+
+    def run(self, ch=1, binary=None, callback=None):
+        """
+        Execute the sweeps.
+
+        Args
+        ====
+        < ch : int : 1-4 >
+
+        < binary : bool :  >
+            See trace_data_query().
+
+        < callback : function :  >
+            Called as callback(i, num, xaxis, trace) after each segment.
+
+        Returns
+        =======
+        < xaxis : numpy.ndarray : (Hz) >
+
+        < spectrum : numpy.ndarray :  >
+        """
+        sa = self.sa
+        if not hasattr(sa, 'sweep_points_set'):
+            # the number of points cannot be changed: check it before
+            # touching the settings (the cached geometry, if any)
+            sa.gen_xaxis()
+            if sa._sweep['points'] != self.points:
+                raise ValueError('%s has %d points, cannot sweep with %d'%(
+                    sa.product_name, sa._sweep['points'], self.points))
+            pass
+        cont = sa.sweep_continuous_query()
+        sa.resolution_bw_set(self.rbw, 'Hz')
+        if hasattr(sa, 'sweep_points_set'):
+            sa.sweep_points_set(self.points)
+            pass
+        sa.sweep_continuous_set(0)
+        spectrum = None
+        try:
+            num = len(self.segments)
+            for i, (start, stop) in enumerate(self.segments):
+                sa.com.send('FREQ:STAR %.3f Hz;:FREQ:STOP %.3f Hz;:INIT:IMM;*OPC?'%(
+                    start, stop))
+                sa.com.readline()
+                sa._sweep_update(start=start, stop=stop)
+                trace = sa.trace_data_query(ch, binary)
+                if len(trace) != self.points:
+                    raise ValueError('expected %d points, got %d'%(
+                        self.points, len(trace)))
+                if spectrum is None:
+                    spectrum = numpy.empty(len(self.xaxis), trace.dtype)
+                    pass
+                j = i * self.step
+                spectrum[j:j + self.points] = trace
+                if callback is not None:
+                    callback(i, num, self.xaxis[j:j + self.points], trace)
+                    pass
+                continue
+        finally:
+            # the frequencies were changed without the setters
+            sa.cache_clear()
+            sa.sweep_continuous_set(cont)
+            pass
+        return self.xaxis, spectrum
@@ -0,0 +1,185 @@
+"""
+Host side processing of spectrum analyzer traces (in dBm).
+
+Use with trace_data_query() or stream_traces() instead of the averaging
+and the marker functions of the analyzer:
+
+>>> avg = trace_average(mode='power')
+>>> for trace in s.stream_traces(n=100, binary=True):
+...     avg.add(trace)
+>>> x = s.gen_xaxis()
+>>> peaks(x, avg.result(), n=3)
+[(1000000000.0, -30.1), ...]
+"""
+import numpy
+
+
+def dbm_to_mw(y):
+    return numpy.power(10., numpy.asarray(y, float) / 10.)
+
+def mw_to_dbm(p):
+    return 10. * numpy.log10(p)
+
+
+class trace_average(object):
+    """
+    Incremental average of traces.
+
+    < mode : str : 'power','log' >
+        'power' averages in linear power (mW), 'log' averages the dB values
+        (as the 'log power' average of the analyzers).
+
+    < alpha : float :  >
+        If given, an exponential average with the weight <alpha> of the
+        new trace, i.e. avg = (1 - alpha) * avg + alpha * trace.
+        The first traces are averaged uniformly until count >= 1/alpha.
+    """
+
+    def __init__(self, mode='power', alpha=None):
+        if mode not in ('power', 'log'):
+            raise ValueError("mode must be 'power' or 'log'")
+        self.mode = mode
+        self.alpha = alpha
+        self.reset()
+        pass
+
+    def reset(self):
+        self.count = 0
+        self._acc = None
+        return
+
+    def add(self, trace):
+        v = dbm_to_mw(trace) if self.mode == 'power' else numpy.array(trace, float)
+        self.count += 1
+        if self._acc is None:
+            self._acc = v
+            return
+        w = 1. / self.count
+        if self.alpha is not None:
+            w = max(w, self.alpha)
+            pass
+        # in place: acc += w * (v - acc)
+        numpy.subtract(v, self._acc, out=v)
+        v *= w
+        self._acc += v
+        return
+
+    def result(self):
+        if self._acc is None: return None
+        if self.mode == 'power':
+            return mw_to_dbm(self._acc)
+        return self._acc.copy()
+
+
+class trace_hold(object):
+    """
+    Max hold / min hold of traces.
+
+    < mode : str : 'max','min' >
+    """
+
+    def __init__(self, mode='max'):
+        if mode not in ('max', 'min'):
+            raise ValueError("mode must be 'max' or 'min'")
+        self.mode = mode
+        self._func = numpy.maximum if mode == 'max' else numpy.minimum
+        self.reset()
+        pass
+
+    def reset(self):
+        self.count = 0
+        self._acc = None
+        return
+
+    def add(self, trace):
+        self.count += 1
+        if self._acc is None:
+            self._acc = numpy.array(trace, float)
+            return
+        self._func(self._acc, trace, out=self._acc)
+        return
+
+    def result(self):
+        if self._acc is None: return None
+        return self._acc.copy()
+
+
+def band_power(x, y, f1, f2, rbw=None, enbw_factor=1.):
+    """
+    Integrated power between <f1> and <f2> (Hz) in dBm.
+
+    The power density is the power of each point divided by the noise
+    bandwidth of the RBW filter (<rbw> * <enbw_factor>). Without <rbw>,
+    the points are summed assuming their spacing equals the bandwidth.
+    """
+    x = numpy.asarray(x)
+    mask = (x >= f1) & (x <= f2)
+    if not mask.any():
+        raise ValueError('no point in %g - %g Hz'%(f1, f2))
+    p = dbm_to_mw(numpy.asarray(y)[mask])
+    if rbw is None:
+        return mw_to_dbm(p.sum())
+    step = (x[-1] - x[0]) / (len(x) - 1)
+    return mw_to_dbm(p.sum() * step / (rbw * enbw_factor))
+
+
+def peaks(x, y, n=1, threshold=None, min_distance=1):
+    """
+    Search the <n> highest local maxima.
+
+    Args
+    ====
+    < x, y : array >
+        Frequency axis and trace.
+
+    < n : int :  >
+        Number of peaks.
+
+    < threshold : float :  >
+        Ignore peaks lower than this.
+
+    < min_distance : int :  >
+        Minimum separation of the peaks in points.
+
+    Returns
+    =======
+    < peaks : list of (freq, level) >
+        From the highest.
+    """
+    y = numpy.asarray(y, float)
+    if len(y) < 3:
+        i = [int(numpy.argmax(y))]
+    else:
+        # local maxima (plateaus count once, at their first point)
+        is_peak = numpy.zeros(len(y), bool)
+        is_peak[1:-1] = (y[1:-1] > y[:-2]) & (y[1:-1] >= y[2:])
+        is_peak[0] = y[0] >= y[1]
+        is_peak[-1] = y[-1] > y[-2]
+        i = numpy.flatnonzero(is_peak)
+        if threshold is not None:
+            i = i[y[i] >= threshold]
+            pass
+        i = i[numpy.argsort(y[i])[::-1]]
+        pass
+    ret = []
+    taken = []
+    for k in i:
+        if any(abs(k - t) < min_distance for t in taken): continue
+        taken.append(k)
+        ret.append((float(x[k]), float(y[k])))
+        if len(ret) >= n: break
+        continue
+    return ret
+
+
+def marker(x, y, freq):
+    """
+    Level at <freq> (Hz), linearly interpolated in dB, as the analyzer
+    marker (CALC:MARK:Y?) would give it.
+    """
+    return float(numpy.interp(freq, x, y))
+
+
+def markers(x, y, freqs):
+    """Levels at each of <freqs>, in one vectorized interpolation."""
+    return numpy.interp(numpy.asarray(freqs, float), x, y)
@@ -0,0 +1,143 @@
+import time
+import numpy
+
+
+class trace_stream(object):
+    """
+    Back-to-back single sweeps of a spectrum analyzer into a ring buffer.
+
+    Made by N9938A.stream_traces(). Continuous sweep is turned off, and
+    each trace is taken by 'INIT:IMM;*OPC?' and a trace query. The traces
+    are written to the rows of <buffer> (depth x points), and the
+    acquisition times to <timestamps>. Iteration yields the row just
+    written, which is a view and is overwritten <depth> traces later.
+
+    With the binary transfer, the traces after the first one are read
+    directly into the buffer rows without an intermediate array.
+
+    The statistics (mean, max_hold, ...) are computed over the traces
+    in the buffer, and are None before the first trace.
+
+    Examples
+    ========
+    >>> with s.stream_traces(n=100, depth=20) as st:
+    ...     for trace in st:
+    ...         print(trace.max())
+    ...     avg = st.mean()
+    """
+
+    def __init__(self, sa, n=None, ch=1, depth=100, binary=None):
+        self.sa = sa
+        self.n = n
+        self.ch = ch
+        self.depth = depth
+        self.binary = binary
+        self.buffer = None
+        self.timestamps = numpy.full(depth, numpy.nan)
+        self.count = 0
+        self._cont = None
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        return
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.n is not None and self.count >= self.n:
+            self.close()
+            raise StopIteration
+        return self.acquire()
+
+    def start(self):
+        if self._cont is None:
+            self._cont = self.sa.sweep_continuous_query()
+            self.sa.sweep_continuous_set(0)
+            pass
+        return
+
+    def close(self):
+        """Restore the continuous sweep setting."""
+        if self._cont is not None:
+            self.sa.sweep_continuous_set(self._cont)
+            self._cont = None
+            pass
+        return
+
+    def acquire(self):
+        """Take one trace into the buffer and return the row (view)."""
+        self.start()
+        self.sa.sweep_single()
+        binary = self.sa.binary if self.binary is None else self.binary
+        i = self.count % self.depth
+        if binary and self.buffer is not None:
+            trace = self.sa.trace_data_query(self.ch, True, out=self.buffer[i])
+        else:
+            trace = self.sa.trace_data_query(self.ch, binary)
+            pass
+        if self.buffer is None:
+            self.buffer = numpy.full((self.depth, len(trace)), numpy.nan, trace.dtype)
+        if len(trace) != self.buffer.shape[1]:
+            raise ValueError('number of points changed (%d -> %d)'%(
+                self.buffer.shape[1], len(trace)))
+        if not numpy.shares_memory(trace, self.buffer):
+            self.buffer[i] = trace
+            pass
+        self.timestamps[i] = time.time()
+        self.count += 1
+        return self.buffer[i]
+
+    # statistics on the buffer
+    # ------------------------
+    @property
+    def filled(self):
+        return min(self.count, self.depth)
+
+    def _order(self):
+        # row indices from the oldest to the latest
+        if self.count <= self.depth:
+            return numpy.arange(self.count)
+        return (numpy.arange(self.depth) + self.count) % self.depth
+
+    def latest(self):
+        if self.count == 0: return None
+        return self.buffer[(self.count - 1) % self.depth]
+
+    def mean(self):
+        """Average of the traces in the buffer (in the unit of the trace)."""
+        if self.filled == 0: return None
+        return self.buffer[:self.filled].mean(axis=0)
+
+    def mean_power(self):
+        """Average in linear power of the traces in dBm."""
+        if self.filled == 0: return None
+        lin = numpy.power(10., self.buffer[:self.filled] / 10.)
+        return 10 * numpy.log10(lin.mean(axis=0))
+
+    def max_hold(self):
+        if self.filled == 0: return None
+        return self.buffer[:self.filled].max(axis=0)
+
+    def min_hold(self):
+        if self.filled == 0: return None
+        return self.buffer[:self.filled].min(axis=0)
+
+    def waterfall(self):
+        """
+        Traces and timestamps in the buffer from the oldest to the latest.
+
+        Returns
+        =======
+        < timestamps : numpy.ndarray : (filled,) >
+        < traces : numpy.ndarray : (filled, points) >
+
+        None before the first trace.
+        """
+        if self.filled == 0: return None
+        order = self._order()
+        return self.timestamps[order], self.buffer[order]
@@ -2,6 +2,8 @@ import serial
 import time, sys, os
 import math
 import datetime
+import threading
+import numpy
 
 
 class ma24126a(object):
@@ -11,6 +13,11 @@ class ma24126a(object):
 
     def __init__(self, port):
         self._pm = self.serial_open(port)
+        self._buffer = b""
+        self._buffer_time = time.time()
+        self._stamps = []
+        # capture() のスレッドと quary() などでポートを共有するためのロック
+        self._lock = threading.RLock()
         return
 
     def serial_open(self, port):
@@ -25,30 +32,62 @@ class ma24126a(object):
         res = self._pm.read(byte)
         return res
 
-    def quary(self, cmd, wt=0.001):
-        self.send(cmd)
-        time.sleep(wt)
-        ret = self.read()
+    def _discard(self):
+        # 以前のタイムアウトで残った応答を捨てる
+        self._pm.reset_input_buffer()
+        self._buffer = b""
+        self._buffer_time = time.time()
+        self._stamps = []
+        return
+
+    def _readline(self, timeout=1.0):
+        """
+        応答を 1 行 (b"\n" まで) 読むメソッド
+        応答が届き次第返る。<timeout> 秒以内に届かなければ TimeoutError
+        """
+        return self._read_lines(1, timeout)[0] + b"\n"
+
+    def _drain(self, num, timeout=1.0):
+        # 送信済みで未受信の <num> 個の応答を待ってから捨てる
+        # (<timeout> 秒間なにも届かなければ諦める)
+        for i in range(num):
+            try:
+                self._read_lines(1, timeout)
+            except TimeoutError:
+                break
+        self._discard()
+        return
+
+    def quary(self, cmd, wt=None, timeout=1.0):
+        # wt: 以前の読み出し前の待ち時間 (不要になった)
+        with self._lock:
+            self._discard()
+            self.send(cmd)
+            ret = self._readline(timeout)
         return ret
 
-    def quary2(self, cmd, wt):
-        self.send(cmd)
-        time.sleep(wt)
-        ret = self.read()
+    def quary2(self, cmd, wt=None, timeout=1.0):
+        # wt: 以前の読み出し前の待ち時間 (不要になった)
+        # quary と違い、残っている応答は捨てずに順に読む
+        with self._lock:
+            self.send(cmd)
+            ret = self._readline(timeout)
         return ret
 
     def wait_ok(self, cmd, mergin, lt):
-        self.send(cmd)
-        t = 0
-        while True:
-            if self.read() == b"OK\n":
-                break
-            else:
-                time.sleep(mergin)
-                t = t + mergin
-                if t > lt:
+        # mergin: 以前のポーリング間隔 (不要になった)
+        with self._lock:
+            self._discard()
+            self.send(cmd)
+            deadline = time.time() + lt
+            while True:
+                try:
+                    ret = self._readline(max(deadline - time.time(), 0))
+                except TimeoutError:
                     print("ERROR. Maybe too long time passed")
                     sys.exit()
+                if ret == b"OK\n":
+                    break
 
     def start(self):
         ret = self.quary(b"START\n")
@@ -64,8 +103,11 @@ class ma24126a(object):
         return True
 
     def close(self):
-        self.read()
-        self._pm.close()
+        with self._lock:
+            self.read()
+            self._buffer = b""
+            self._stamps = []
+            self._pm.close()
         return
 
     def power(self):
@@ -74,16 +116,99 @@ class ma24126a(object):
 
     def power_cnt(self, count, mergin):
         a = 0
-        while a < count:
-            st = time.time()
-            self.send(b"PWR?\n")
-            ft = time.time()
-            tt = mergin - (st - ft)
-            time.sleep(tt)
-            a = a + 1
-        ret = self.read(10 * count)
+        with self._lock:
+            while a < count:
+                st = time.time()
+                self.send(b"PWR?\n")
+                ft = time.time()
+                tt = mergin - (ft - st)
+                if tt > 0:
+                    time.sleep(tt)
+                a = a + 1
+            ret = self.read(10 * count)
         return ret
 
+    def _read_lines(self, num, timeout=1.0, stamps=None):
+        """
+        応答を <num> 行 (b"\n" を除く) 読むメソッド
+        最後の行より後に届いたバイトは次の呼び出しのためにバッファに残す
+        <stamps> (array of <num>) には各行の受信時刻 (time.time()) を書き込む
+        1 回の read で届いた行の時刻は、前回の read からの間で等間隔に補間する
+        """
+        buf = self._buffer
+        times = self._stamps
+        found = len(times)
+        deadline = time.time() + timeout
+        while found < num:
+            if time.time() > deadline:
+                self._buffer = buf
+                raise TimeoutError("%d of %d lines within %.1f sec" % (found, num, timeout))
+            data = self._pm.read(max(self._pm.in_waiting, 1))
+            now = time.time()
+            k = data.count(b"\n")
+            if k > 0:
+                times.extend(numpy.linspace(self._buffer_time, now, k + 1)[1:])
+            self._buffer_time = now
+            found += k
+            buf += data
+        lines = buf.split(b"\n", num)
+        self._buffer = lines.pop()
+        if stamps is not None:
+            stamps[:] = times[:num]
+        self._stamps = times[num:]
+        return lines
+
+    def power_burst(self, count, window=16, timeout=1.0):
+        """
+        <count> 回の PWR? を連続して測定するメソッド
+        応答を待たずに最大 <window> 個の PWR? を送っておき、
+        応答を受け取った分だけ追加で送る
+        途中でタイムアウトなどのエラーが起きた場合は、送信済みの PWR? の
+        応答を待って捨ててから例外を送出する (次の測定に混ざらないように)
+
+        Returns
+        =======
+        < timestamps : numpy.ndarray : (count,) >
+            各応答を受信した時刻 (time.time(), _read_lines を参照)
+        < power : numpy.ndarray : (count,) >
+        """
+        values = numpy.empty(count)
+        stamps = numpy.empty(count)
+        sent = 0
+        done = 0
+        with self._lock:
+            if not self._stamps:
+                # 応答は最初の PWR? の送信より前には届かない
+                self._buffer_time = time.time()
+            try:
+                while done < count:
+                    k = min(window - (sent - done), count - sent)
+                    if k > 0:
+                        self.send(b"PWR?\n" * k)
+                        sent += k
+                    # 未受信の応答の半分を読み、その分を追加で送る
+                    n = max((sent - done) // 2, 1) if sent < count else sent - done
+                    lines = self._read_lines(n, timeout, stamps[done : done + n])
+                    done += n
+                    values[done - n : done] = numpy.array(lines, float)
+            except:
+                self._drain(sent - done, timeout)
+                raise
+        return stamps, values
+
+    def capture(self, decimation=1, depth=100000, window=16, callback=None):
+        """
+        バックグラウンドで PWR? を連続測定するメソッド
+        <decimation> 点ごとの平均をリングバッファ (<depth> 点) に書き込む
+        capture.stop() で停止、capture.data() でデータを取得
+
+        >>> cap = pm.capture(decimation=10)
+        >>> time.sleep(60)
+        >>> cap.stop()
+        >>> t, p = cap.data()
+        """
+        return power_capture(self, decimation, depth, window, callback).start()
+
     def change_avetyp(self, avty):
         """
         平均化タイプを変更するメソッド
@@ -280,3 +405,76 @@ class ma24126a(object):
     def check_freq(self):
         ret = self.quary(b"FREQ?\n")
         return ret
+
+
+class power_capture(object):
+    """
+    ma24126a.capture() で作られる、バックグラウンドで PWR? を連続測定するクラス
+    power_burst() で <decimation> x <block> 点ずつ測定し、<decimation> 点ごとに
+    (パワーと時刻を) 平均して <depth> 点のリングバッファに書き込む
+    <callback> は平均したブロックごとに測定スレッドから
+    callback(timestamps, power) として呼ばれる
+    """
+
+    block = 16
+
+    def __init__(self, pm, decimation=1, depth=100000, window=16, callback=None):
+        self.pm = pm
+        self.decimation = decimation
+        self.depth = depth
+        self.window = window
+        self.callback = callback
+        self.values = numpy.full(depth, numpy.nan)
+        self.timestamps = numpy.full(depth, numpy.nan)
+        self.count = 0
+        self.error = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        return
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.error is not None:
+            raise self.error
+        return
+
+    def _run(self):
+        d = self.decimation
+        try:
+            while not self._stop.is_set():
+                t, v = self.pm.power_burst(d * self.block, self.window)
+                t = t.reshape(-1, d).mean(axis=1)
+                v = v.reshape(-1, d).mean(axis=1)
+                self._append(t, v)
+                if self.callback is not None:
+                    self.callback(t, v)
+        except Exception as e:
+            self.error = e
+        return
+
+    def _append(self, t, v):
+        with self._lock:
+            i = (self.count + numpy.arange(len(v))) % self.depth
+            self.values[i] = v
+            self.timestamps[i] = t
+            self.count += len(v)
+        return
+
+    def data(self):
+        """バッファ内の時刻とパワーを古い順に返す (コピー)"""
+        with self._lock:
+            if self.count <= self.depth:
+                order = numpy.arange(self.count)
+            else:
+                order = (numpy.arange(self.depth) + self.count) % self.depth
+            return self.timestamps[order], self.values[order]
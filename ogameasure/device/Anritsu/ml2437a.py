@@ -2,15 +2,20 @@
 
 import time
 from ..SCPI import scpi
+from .power_sampler import power_sampler
 
 
 class ml2437a(scpi.scpi_family):
 
+    # not a SCPI device: commands in one message are not prefixed with ':'
+    _batch_root = ""
+
     def initilize(self, ch=1, resolution=3):
 
-        for i in range(ch):
-            self.com.send("CHUNIT %d, DBM" % (i))
-            self.com.send("CHRES %d, %d" % (i, resolution))
+        with self.batch():
+            for i in range(1, ch + 1):
+                self.com.send("CHUNIT %d, DBM" % (i))
+                self.com.send("CHRES %d, %d" % (i, resolution))
 
     def check(self, ch=1):
 
@@ -44,6 +49,28 @@ class ml2437a(scpi.scpi_family):
         power = float(ret)
         return power
 
+    def sampler(self, chs=(1, 2), depth=10000):
+        """
+        DESCRIPTION
+        ================
+        This function makes a sampler, which reads all the channels with
+        one program message per sample into ring buffers, and computes
+        moving averages, Allan variance and min/max on them.
+        See power_sampler.
+        ARGUMENTS
+        ================
+        1. chs: the sensor channel numbers.
+            Type: tuple of int
+            Default: (1, 2)
+        2. depth: the number of samples kept in the buffers.
+            Type: int
+            Default: 10000
+        RETURNS
+        ================
+        1. sampler: power_sampler
+        """
+        return power_sampler(self, chs, depth)
+
     def set_average_onoff(self, onoff, sensor="A"):
         """
         DESCRIPTION
@@ -0,0 +1,141 @@
+import time
+import numpy
+
+
+class power_sampler(object):
+    """
+    Multi-channel sampling of a ML2437A/ML2438A into ring buffers.
+
+    Made by ml2437a.sampler(). All the channels are read with one program
+    message per sample ('O 1;O 2'), and the readings are written to the
+    rows of <values> (channels x depth, float64) with their times
+    (time.monotonic()) in <timestamps>. The statistics are computed on the
+    buffer with numpy, instead of the averaging of the meter.
+
+    Examples
+    ========
+    >>> s = pm.sampler(chs=(1, 2), depth=100000)
+    >>> s.run(10000)
+    >>> s.allan_variance(1, taus=[1, 10, 100])
+    >>> s.moving_average(2, 100)
+    """
+
+    def __init__(self, pm, chs=(1, 2), depth=10000):
+        self.pm = pm
+        self.chs = tuple(chs)
+        self.depth = depth
+        self.values = numpy.full((len(self.chs), depth), numpy.nan)
+        self.timestamps = numpy.full(depth, numpy.nan)
+        self.count = 0
+        self._query = ";".join("O %d" % (ch) for ch in self.chs)
+        return
+
+    def _read(self):
+        # the outputs may come in one line (separated by ',' or ';') or
+        # one line each
+        ret = []
+        while len(ret) < len(self.chs):
+            line = self.pm.com.readline().strip()
+            ret += line.replace(";", ",").split(",")
+        return [float(r) for r in ret]
+
+    def acquire(self):
+        """Take one sample of all the channels. Returns (timestamp, values)."""
+        com = self.pm.com
+        t0 = time.monotonic()
+        com.send(self._query)
+        v = self._read()
+        t = (t0 + time.monotonic()) / 2
+        i = self.count % self.depth
+        self.values[:, i] = v
+        self.timestamps[i] = t
+        self.count += 1
+        return t, v
+
+    def run(self, n):
+        """Take <n> samples."""
+        for _ in range(n):
+            self.acquire()
+        return
+
+    # statistics on the buffer
+    # ------------------------
+    @property
+    def filled(self):
+        return min(self.count, self.depth)
+
+    def _order(self):
+        if self.count <= self.depth:
+            return numpy.arange(self.count)
+        return (numpy.arange(self.depth) + self.count) % self.depth
+
+    def data(self, ch=None):
+        """
+        Timestamps and values in the buffer from the oldest.
+        Values are (channels, filled), or (filled,) for one <ch>.
+        """
+        order = self._order()
+        if ch is None:
+            return self.timestamps[order], self.values[:, order]
+        return self.timestamps[order], self.values[self.chs.index(ch), order]
+
+    def mean(self, ch):
+        if self.count == 0: return numpy.nan
+        return self.data(ch)[1].mean()
+
+    def minmax(self, ch):
+        if self.count == 0: return numpy.nan, numpy.nan
+        v = self.data(ch)[1]
+        return v.min(), v.max()
+
+    def moving_average(self, ch, width):
+        """
+        Moving average over <width> samples (length: filled - width + 1,
+        empty if fewer than <width> samples).
+        """
+        v = self.data(ch)[1]
+        if len(v) < width: return numpy.empty(0)
+        c = numpy.concatenate(([0.0], numpy.cumsum(v)))
+        return (c[width:] - c[:-width]) / width
+
+    def allan_variance(self, ch, taus=None, linear=False):
+        """
+        Non-overlapping Allan variance.
+
+        Args
+        ====
+        < ch : int :  >
+
+        < taus : list of int :  >
+            Averaging lengths in samples. default = 1, 2, 4, ... up to
+            a half of the data.
+
+        < linear : bool :  >
+            If True, computed in mW instead of dBm.
+
+        Returns
+        =======
+        < taus : numpy.ndarray : (sec) >
+            Averaging times, from the mean sampling interval.
+
+        < avar : numpy.ndarray :  >
+
+        Both are empty with less than 2 samples.
+        """
+        t, v = self.data(ch)
+        n = len(v)
+        if n < 2: return numpy.empty(0), numpy.empty(0)
+        if linear:
+            v = numpy.power(10.0, v / 10.0)
+        if taus is None:
+            taus = 2 ** numpy.arange(max(int(numpy.log2(n / 2)), 0) + 1)
+        taus = numpy.asarray(taus, int)
+        avar = numpy.full(len(taus), numpy.nan)
+        for i, m in enumerate(taus):
+            k = n // m
+            if k < 2:
+                continue
+            y = v[: k * m].reshape(k, m).mean(axis=1)
+            avar[i] = 0.5 * numpy.mean(numpy.diff(y) ** 2)
+        dt = (t[-1] - t[0]) / (n - 1)
+        return taus * dt, avar
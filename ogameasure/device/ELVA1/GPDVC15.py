@@ -4,6 +4,7 @@ import socket
 import numpy
 import ogameasure
 from ..SCPI import scpi
+from ..SCPI.errors import error_handler_base
 
 
 # ==============
@@ -53,7 +54,8 @@ class error_item(object):
         self.txt = txt
         pass
 
-class error_handler(object):
+class error_handler(error_handler_base):
+    label = 'Power meter'
     error_list = [
         error_item(-100, 'Command error', ''),
         error_item(-200, 'Execution error', ''),
@@ -61,27 +63,6 @@ class error_handler(object):
         error_item(-350, 'Queue overflow', ''),
     ]
 
-    @classmethod
-    def check(cls, num, msg):
-        if num==0: return
-        for e in cls.error_list:
-            if msg == e.msg:
-                emsg = '%s (%d)'%(e.msg, e.num)
-                msg = 'Power meter returned Error message.\n'
-                msg += '*'*len(emsg) + '\n'
-                msg += emsg + '\n'
-                msg += '*'*len(emsg) + '\n'
-                msg += e.txt + '\n'
-                raise StandardError(msg)
-            continue
-        _msg = 'Power meter returned Error message.\n'
-        emsg = '%s (%d)\n'%(msg, num)
-        _msg += '*'*len(emsg) + '\n'
-        _msg += emsg
-        _msg += '*'*len(emsg) + '\n'
-        raise StandardError(_msg)
-        return
-
 
 # ==========
 # main class
@@ -120,8 +101,7 @@ class GPDVC15(scpi.scpi_family):
         return
 
     def _error_check(self):
-        err_num, err_msg = self.error_query()
-        error_handler.check(err_num, err_msg)
+        self._check_errors(error_handler)
         return
 
     def error_query(self):
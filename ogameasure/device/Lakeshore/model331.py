@@ -9,6 +9,7 @@ class model331(scpi.scpi_family):
 
     _scpi_enable = '*CLS *ESE *ESE? *ESR? *IDN? *OPC *OPC? *RST *SRE ' \
                    + '*SRE? *STB? *TST? *WAI'
+    _batch_root = ''
 
     """
     def __init__(self, com):
@@ -1 +1,3 @@
 from .scpi import scpi_common
+from .async_scpi import async_scpi_family
+from .async_scpi import async_device
@@ -0,0 +1,151 @@
+import asyncio
+import functools
+import concurrent.futures
+from . import scpi
+
+
+class async_scpi_family(object):
+    """
+    Base class of asyncio SCPI devices.
+
+    <com> must be an asyncio communicator (e.g. async_ethernet). The common
+    commands listed in <_scpi_enable> are added as coroutine methods with the
+    same names and shortcuts as scpi.scpi_family:
+
+    >>> s = async_scpi_family(async_ethernet('192.168.100.1', 5025))
+    >>> await s.open()
+    >>> await s.IDNQ()
+    ['Agilent Technologies', 'N9938A', ...]
+    """
+    manufacturer = ''
+    product_name = ''
+    classification = ''
+
+    com = None
+    _scpi_enable = 'ALL'
+
+    # response parsers of the common queries (others are returned as str).
+    # The commands and method names are those of scpi.scpi_common.
+    _scpi_async_parsers = {
+        '*IDN?': lambda x: x.split(','),
+        '*CAL?': int, '*EMC?': int, '*ESE?': int, '*ESR?': int, '*IST?': int,
+        '*OPC?': int, '*PRE?': int, '*PSC?': int, '*SRE?': int, '*STB?': int,
+        '*TST?': int,
+    }
+
+    def __init__(self, com):
+        self.com = com
+        self._add_scpi_methods()
+        pass
+
+    def _add_scpi_methods(self):
+        sdic = scpi.scpi_common._scpi_dict
+        if self._scpi_enable=='ALL': add = sdic.keys()
+        else:
+            add = [e for e in self._scpi_enable.split(' ') if e in sdic]
+            pass
+        for call in add:
+            method = sdic[call]
+            if method.endswith('_query'):
+                func = self._make_scpi_method(
+                    call, self._scpi_async_parsers.get(call, str))
+            else:
+                # e.g. '*TRG?' : 'scpi_trigger' sends '*TRG'
+                func = self._make_scpi_method(call.rstrip('?'), None)
+                pass
+            self.__setattr__(method, func)
+            shortcut = call.replace('*', '').replace('?', 'Q')
+            self.__setattr__(shortcut, func)
+            continue
+        return
+
+    def _make_scpi_method(self, call, parser):
+        if parser is None:
+            async def func(*args):
+                msg = call
+                if args: msg += ' ' + ','.join(str(a) for a in args)
+                await self.send(msg)
+                return
+        else:
+            async def func():
+                ret = await self.query(call)
+                return parser(ret)
+            pass
+        return func
+
+    async def open(self):
+        await self.com.open()
+        return
+
+    async def close(self):
+        await self.com.close()
+        return
+
+    async def send(self, msg):
+        await self.com.send(msg)
+        return
+
+    async def query(self, msg):
+        ret = await self.com.query(msg)
+        return ret.strip()
+
+
+class async_device(object):
+    """
+    Run the methods of a (blocking) device driver as coroutines.
+
+    Every method call is executed in a worker thread dedicated to the
+    device, so calls to one device are serialized while calls to different
+    devices run concurrently:
+
+    >>> sg = async_device(ogameasure.Agilent.E8257D(com1))
+    >>> sa = async_device(ogameasure.Agilent.N9938A(com2))
+    >>> freq, trace = await asyncio.gather(sg.freq_query(),
+    ...                                    sa.trace_data_query())
+
+    The worker thread is stopped by shutdown(), or at the exit of
+    'async with':
+
+    >>> async with async_device(ogameasure.Agilent.N9938A(com)) as sa:
+    ...     trace = await sa.trace_data_query()
+    """
+
+    def __init__(self, device, executor=None):
+        self._own_executor = executor is None
+        if executor is None:
+            executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+            pass
+        self.device = device
+        self.executor = executor
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.shutdown()
+        return
+
+    async def shutdown(self):
+        """
+        Wait for the calls in progress and stop the worker thread. An
+        executor given to the constructor is left to its owner.
+        (Not named close(), which is a method of the device.)
+        """
+        if self._own_executor:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.executor.shutdown)
+            pass
+        return
+
+    def __getattr__(self, name):
+        attr = getattr(self.device, name)
+        if not callable(attr): return attr
+
+        async def func(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            call = functools.partial(attr, *args, **kwargs)
+            ret = await loop.run_in_executor(self.executor, call)
+            return ret
+
+        return func
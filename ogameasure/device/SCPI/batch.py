@@ -0,0 +1,202 @@
+import concurrent.futures
+
+
+def split_response(msg):
+    """
+    Split a response message into the responses of each query.
+
+    Responses to the queries in one program message are joined with ';'.
+    ';' in a quoted string (e.g. an error message) is not a separator.
+    """
+    ret = []
+    quote = None
+    start = 0
+    for i, c in enumerate(msg):
+        if quote is not None:
+            if c == quote: quote = None
+        elif c in '"\'':
+            quote = c
+        elif c == ';':
+            ret.append(msg[start:i])
+            start = i + 1
+            pass
+        continue
+    ret.append(msg[start:])
+    return ret
+
+
+class scpi_batch(object):
+    """
+    Buffer of SCPI commands, sent as one program message.
+
+    Made by scpi_family.batch(). While batching, the driver methods send
+    through this object instead of the communicator. Commands are joined
+    with ';' and written at once when the batch is flushed; query responses
+    are handed back to the futures returned by query(), or to readline()
+    when a driver method needs a response immediately.
+
+    < root : str : ':','' >
+        Prefix put to each command except the first and the common (*)
+        commands, so that the command headers are not interpreted relative
+        to the previous one. Use '' for non-SCPI devices.
+
+    < max_length : int :  >
+        Flush before the program message gets longer than this (in bytes).
+        None means no limit.
+    """
+
+    def __init__(self, com, root=':', max_length=None):
+        self.com = com
+        self.root = root
+        self.max_length = max_length
+        self.messages = []
+        self.futures = []
+        self.unclaimed = []
+        self.length = 0
+        pass
+
+    def _join(self):
+        msgs = [self.messages[0]]
+        for m in self.messages[1:]:
+            if m[0] not in '*:': m = self.root + m
+            msgs.append(m)
+            continue
+        return ';'.join(msgs)
+
+    def _append(self, msg, future):
+        if self.max_length is not None:
+            if self.messages and self.length + len(msg) + 2 > self.max_length:
+                self.flush()
+                pass
+            pass
+        self.messages.append(msg)
+        self.futures.append(future)
+        self.length += len(msg) + 2
+        return
+
+    def open(self):
+        return
+
+    def send(self, msg):
+        future = None
+        if '?' in msg:
+            future = concurrent.futures.Future()
+            self.unclaimed.append(future)
+            pass
+        self._append(msg, future)
+        return
+
+    def query(self, msg, conv=None):
+        """
+        Queue a query and return a future of its (stripped) response.
+        <conv> is applied to the response, e.g. float.
+        """
+        future = concurrent.futures.Future()
+        future.conv = conv
+        self._append(msg, future)
+        return future
+
+    def readline(self):
+        if not self.unclaimed:
+            raise RuntimeError('readline() without a query in the batch')
+        future = self.unclaimed.pop(0)
+        if not future.done():
+            self.flush()
+            pass
+        return future.result()
+
+    def _send_direct(self):
+        # send the query of the next response (a binary block) by itself,
+        # after the commands buffered before it
+        if not self.unclaimed:
+            raise RuntimeError('read_block() without a query in the batch')
+        future = self.unclaimed.pop(0)
+        if future.done():
+            raise RuntimeError('the binary response was already read as text')
+        i = self.futures.index(future)
+        msg = self.messages[i]
+        after = (self.messages[i + 1:], self.futures[i + 1:])
+        self.messages = self.messages[:i]
+        self.futures = self.futures[:i]
+        self.length = sum(len(m) + 2 for m in self.messages)
+        self.flush()
+        future.cancel()
+        self.com.send(msg)
+        return after
+
+    def _restore(self, after):
+        self.messages, self.futures = after
+        self.length = sum(len(m) + 2 for m in self.messages)
+        return
+
+    def read_block(self, terminated=True, out=None):
+        """
+        Read a binary block response (see communicator.read_block). The
+        commands buffered before the query are flushed, and the query is
+        sent by itself.
+        """
+        after = self._send_direct()
+        try:
+            return self.com.read_block(terminated, out)
+        finally:
+            self._restore(after)
+            pass
+
+    def read_blocks(self, num, terminated=True):
+        after = self._send_direct()
+        try:
+            return self.com.read_blocks(num, terminated)
+        finally:
+            self._restore(after)
+            pass
+
+    def read_block_array(self, dtype='<f4', terminated=True, out=None):
+        after = self._send_direct()
+        try:
+            return self.com.read_block_array(dtype, terminated, out)
+        finally:
+            self._restore(after)
+            pass
+
+    def flush(self):
+        if not self.messages: return
+        message = self._join()
+        futures = [f for f in self.futures if f is not None]
+        self.messages = []
+        self.futures = []
+        self.length = 0
+        try:
+            self.com.send(message)
+            responses = []
+            while len(responses) < len(futures):
+                responses += split_response(self.com.readline().strip())
+                continue
+        except Exception as e:
+            for f in futures:
+                f.set_exception(e)
+                continue
+            raise
+        for f, r in zip(futures, responses):
+            if hasattr(f, 'conv'):
+                r = r.strip()
+                if f.conv is not None:
+                    try:
+                        r = f.conv(r)
+                    except Exception as e:
+                        f.set_exception(e)
+                        continue
+                    pass
+                pass
+            f.set_result(r)
+            continue
+        return
+
+    def cancel(self):
+        for f in self.futures:
+            if f is not None: f.cancel()
+            continue
+        self.messages = []
+        self.futures = []
+        self.unclaimed = []
+        self.length = 0
+        return
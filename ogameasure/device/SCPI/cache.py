@@ -0,0 +1,138 @@
+import functools
+
+
+class setting_cache(object):
+    """
+    Shadow of the settings written to a device.
+
+    Made by scpi_family.cache_enable(). The setters listed in the
+    <_cached_settings> of the driver are wrapped, so that a setter called
+    with the same arguments as the last write of the setting does nothing.
+
+    <_cached_settings> maps a setter to the query of its setting, or to a
+    tuple of queries whose first one is the setting and the others are the
+    settings that change together (e.g. start frequency -> center, span):
+
+    >>> _cached_settings = {
+    ...     'freq_set': 'freq_query',
+    ...     'frequency_start_set': ('frequency_start_query',
+    ...                             'frequency_center_query', ...),
+    ... }
+
+    With <trusted>=True, the queries are also answered from the cache
+    until a setter of the setting is called, i.e. the device is assumed
+    not to be operated by anything else.
+
+    While the error checks are deferred (in batch() or errors_deferred()),
+    the writes are kept as unconfirmed until the deferred error check has
+    passed (confirm()), and forgotten if the batch fails or an error is
+    found (revert()), as the command may not have reached the device.
+
+    All the settings are forgotten on *RST and *RCL.
+    """
+
+    _reset_methods = ('scpi_reset', 'RST', 'scpi_recall', 'RCL')
+
+    def __init__(self, trusted=False):
+        self.trusted = trusted
+        self.written = {}
+        self.values = {}
+        self.unconfirmed = []
+        self.skipped = 0
+        self.hits = 0
+        self.installed = {}
+        pass
+
+    def clear(self):
+        self.written = {}
+        self.values = {}
+        self.unconfirmed = []
+        return
+
+    def confirm(self):
+        self.unconfirmed = []
+        return
+
+    def revert(self):
+        self.invalidate(self.unconfirmed)
+        self.unconfirmed = []
+        return
+
+    def invalidate(self, keys):
+        for key in keys:
+            self.written.pop(key, None)
+            self.values.pop(key, None)
+            continue
+        return
+
+    def install(self, dev):
+        queries = set()
+        for setter, keys in dev._cached_settings.items():
+            if type(keys) == str: keys = (keys,)
+            self._wrap(dev, setter, self._setter(dev, getattr(dev, setter), setter, keys))
+            queries.update(keys)
+            continue
+        for query in queries:
+            if not hasattr(dev, query): continue
+            self._wrap(dev, query, self._query(getattr(dev, query), query))
+            continue
+        for name in self._reset_methods:
+            if not hasattr(dev, name): continue
+            self._wrap(dev, name, self._reset(getattr(dev, name)))
+            continue
+        return
+
+    def uninstall(self, dev):
+        for name, original in self.installed.items():
+            if original is None:
+                delattr(dev, name)
+            else:
+                setattr(dev, name, original)
+                pass
+            continue
+        self.installed = {}
+        return
+
+    def _wrap(self, dev, name, wrapper):
+        # keep the instance attribute (e.g. RST) to restore it at uninstall
+        self.installed[name] = dev.__dict__.get(name)
+        setattr(dev, name, wrapper)
+        return
+
+    def _setter(self, dev, func, name, keys):
+        @functools.wraps(func)
+        def setter(*args, **kwargs):
+            value = (name, args, tuple(sorted(kwargs.items())))
+            if self.written.get(keys[0]) == value:
+                self.skipped += 1
+                return
+            self.invalidate(keys)
+            ret = func(*args, **kwargs)
+            self.written[keys[0]] = value
+            if dev._error_policy == 'deferred':
+                self.unconfirmed.append(keys[0])
+                pass
+            return ret
+        return setter
+
+    def _query(self, func, name):
+        @functools.wraps(func)
+        def query(*args, **kwargs):
+            if not self.trusted:
+                return func(*args, **kwargs)
+            key = (args, tuple(sorted(kwargs.items())))
+            values = self.values.setdefault(name, {})
+            if key in values:
+                self.hits += 1
+                return values[key]
+            ret = func(*args, **kwargs)
+            values[key] = ret
+            return ret
+        return query
+
+    def _reset(self, func):
+        @functools.wraps(func)
+        def reset(*args, **kwargs):
+            self.clear()
+            return func(*args, **kwargs)
+        return reset
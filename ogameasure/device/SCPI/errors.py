@@ -0,0 +1,55 @@
+class error_handler_base(object):
+    """
+    Error table of a device, checked by scpi_family._check_errors().
+
+    A driver module subclasses this with the <error_list> of the device
+    (error_item(num, msg, txt), as listed in the manual) and the <label>
+    put in the report:
+
+    >>> class error_handler(error_handler_base):
+    ...     label = 'Power meter'
+    ...     error_list = [
+    ...         error_item(-113, 'Undefined header', 'A command was ...'),
+    ...     ]
+
+    The entry is looked up by the error number. The message is used only
+    to choose among the entries sharing a number, and the first of them is
+    taken if none matches (e.g. the message has details appended).
+    """
+    label = 'Device'
+    error_list = []
+    num_index = {}
+    msg_index = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.num_index = dict((e.num, e) for e in reversed(cls.error_list))
+        cls.msg_index = dict(((e.num, e.msg), e) for e in cls.error_list)
+        return
+
+    @classmethod
+    def lookup(cls, num, msg):
+        e = cls.num_index.get(num)
+        if e is not None and e.msg != msg:
+            e = cls.msg_index.get((num, msg), e)
+            pass
+        return e
+
+    @classmethod
+    def report(cls, num, msg, txt=''):
+        emsg = '%s (%d)'%(msg, num)
+        ret = '%s returned Error message.\n'%(cls.label)
+        ret += '*'*len(emsg) + '\n'
+        ret += emsg + '\n'
+        ret += '*'*len(emsg) + '\n'
+        if txt: ret += txt + '\n'
+        return ret
+
+    @classmethod
+    def check(cls, num, msg):
+        if num==0: return
+        e = cls.lookup(num, msg)
+        if e is not None:
+            raise Exception(cls.report(e.num, e.msg, e.txt))
+        raise Exception(cls.report(num, msg))
+        return
@@ -1,4 +1,7 @@
+import contextlib
 from .. import device
+from . import batch
+from . import cache
 
 class scpi_common(device.device):
     
@@ -566,6 +569,11 @@ class scpi_common(device.device):
 class scpi_family(device.device):
 
     _scpi_enable = 'ALL'
+    _batch_root = ':'
+
+    # setter : query (or tuple of queries) of the setting, see cache_enable()
+    _cached_settings = {}
+    _cache = None
 
     def __init__(self, com):
         device.device.__init__(self, com)
@@ -589,3 +597,303 @@ class scpi_family(device.device):
             continue
         return
     
+
+    @contextlib.contextmanager
+    def batch(self, max_length=None):
+        """
+        (Helper Method) Batch Commands
+        ------------------------------
+        Send the commands issued in the context as one program message.
+
+        The commands are joined with ';' and written in a single write when
+        the context exits. Queries queued with query() return futures that
+        are resolved at the exit. A driver method that needs a response
+        immediately flushes the commands buffered until then.
+
+        The error checks of the driver methods are deferred in the context;
+        the SYST:ERR? queries to read the error queue are appended to the
+        program message sent at the exit, and the first error is raised.
+
+        Args
+        ====
+        < max_length : int :  >
+            Maximum length of one program message in bytes.
+            default = None (no limit)
+
+        Returns
+        =======
+        < batch : scpi_batch :  >
+            The batch object. Use batch.send() and batch.query().
+
+        Examples
+        ========
+        >>> with s.batch() as b:
+        ...     s.frequency_start_set(1)
+        ...     s.frequency_stop_set(2)
+        ...     start = b.query('FREQ:STAR?', float)
+        >>> start.result()
+        1000000000.0
+        """
+        if isinstance(self.com, batch.scpi_batch):
+            yield self.com
+            return
+        com = self.com
+        b = batch.scpi_batch(com, self._batch_root, max_length)
+        self.com = b
+        self._scpi.com = b
+        policy = self._error_policy
+        # already deferred: checked by the outer errors_deferred()
+        defer = policy != 'deferred'
+        self._error_policy = 'deferred'
+        errors = None
+        try:
+            yield b
+            if defer and self._error_pending is not None:
+                errors = [b.query('SYST:ERR?') for i in range(self._error_chunk)]
+                pass
+            b.flush()
+        except:
+            b.cancel()
+            if defer: self._error_pending = None
+            self._cache_revert()
+            raise
+        finally:
+            self.com = com
+            self._scpi.com = com
+            self._error_policy = policy
+            pass
+        if errors is not None:
+            self._check_drained([f.result() for f in errors])
+            pass
+        if defer: self._cache_confirm()
+        return
+
+    def cache_enable(self, trusted=False):
+        """
+        (Helper Method) Enable Setting Cache
+        ------------------------------------
+        Skip the setters called with the same value as the last written one.
+        See cache.setting_cache for the details. The settings are forgotten
+        on *RST/*RCL, or by cache_clear() (e.g. after the front panel is
+        operated).
+
+        Args
+        ====
+        < trusted : bool :  >
+            Also answer the queries of the settings from the cache, until
+            the setting is changed through this driver.
+
+        Returns
+        =======
+        Nothing.
+
+        Examples
+        ========
+        >>> sg.cache_enable()
+        >>> sg.power_set(-10)
+        >>> sg.power_set(-10)  # not sent
+        """
+        self.cache_disable()
+        self._cache = cache.setting_cache(trusted)
+        self._cache.install(self)
+        return
+
+    def cache_disable(self):
+        if self._cache is not None:
+            self._cache.uninstall(self)
+            self._cache = None
+            pass
+        return
+
+    def cache_clear(self):
+        if self._cache is not None:
+            self._cache.clear()
+            pass
+        return
+
+    def _cache_confirm(self):
+        # the deferred error check has passed
+        if self._cache is not None:
+            self._cache.confirm()
+            pass
+        return
+
+    def _cache_revert(self):
+        # the writes since the last check may not have been applied
+        if self._cache is not None:
+            self._cache.revert()
+            pass
+        return
+
+    # error checking
+    # --------------
+    error_policies = ('immediate', 'deferred', 'status-byte')
+    _error_policy = 'immediate'
+    _error_pending = None
+    # number of SYST:ERR? queries per program message
+    _error_chunk = 8
+    # status byte: error/event queue not empty (bit 2), event status (bit 5)
+    _error_stb_mask = 0x24
+
+    def error_policy_set(self, policy):
+        """
+        (Helper Method) Set Error Checking Policy
+        -----------------------------------------
+        Select how the driver methods check the error queue of the device
+        after each command.
+
+        Args
+        ====
+        < policy : str : 'immediate','deferred','status-byte' >
+            'immediate' : query SYST:ERR? after each command (default).
+            'deferred' : do not query after each command; the error queue
+                         is checked once by error_flush() (called at the
+                         exit of errors_deferred()).
+            'status-byte' : query *STB? after each command, and read the
+                            error queue only if its error bits are set.
+
+        Returns
+        =======
+        Nothing.
+
+        Examples
+        ========
+        >>> s.error_policy_set('status-byte')
+        """
+        if policy not in self.error_policies:
+            msg = 'policy must be one of %s, not %r'%(self.error_policies, policy)
+            raise ValueError(msg)
+        self._error_policy = policy
+        return
+
+    @contextlib.contextmanager
+    def errors_deferred(self):
+        """
+        (Helper Method) Defer Error Checks
+        ----------------------------------
+        Skip the error checks of the commands issued in the context, and
+        check the error queue once at the exit. Combined with batch(), the
+        commands are sent in one program message without the SYST:ERR?
+        round trip in between.
+
+        Examples
+        ========
+        >>> with s.errors_deferred(), s.batch():
+        ...     s.frequency_start_set(1)
+        ...     s.frequency_stop_set(2)
+        """
+        policy = self._error_policy
+        self._error_policy = 'deferred'
+        try:
+            yield
+        except:
+            self._cache_revert()
+            raise
+        finally:
+            self._error_policy = policy
+            pass
+        self.error_flush()
+        return
+
+    def _check_errors(self, handler):
+        # called from _error_check() of the drivers, with the error_handler
+        # of the driver module
+        policy = self._error_policy
+        if policy == 'deferred':
+            self._error_pending = handler
+            return
+        if policy == 'status-byte':
+            self.com.send('*STB?')
+            stb = int(self.com.readline())
+            if not stb & self._error_stb_mask: return
+            errors = self.error_queue_drain()
+            if errors: handler.check(*errors[0])
+            return
+        err_num, err_msg = self.error_query()
+        handler.check(err_num, err_msg)
+        return
+
+    def error_flush(self):
+        """
+        (Helper Method) Check Deferred Errors
+        -------------------------------------
+        Read the error queue if commands were issued with the error checks
+        deferred, and raise the first error.
+
+        Returns
+        =======
+        Nothing.
+        """
+        handler = self._error_pending
+        self._error_pending = None
+        if handler is None:
+            self._cache_confirm()
+            return
+        errors = self.error_queue_drain()
+        if errors:
+            self._cache_revert()
+            handler.check(*errors[0])
+            pass
+        self._cache_confirm()
+        return
+
+    def _check_drained(self, responses):
+        # responses of SYST:ERR? sent with a batch
+        handler = self._error_pending
+        self._error_pending = None
+        errors = self._parse_errors(responses)
+        if len(errors) == len(responses):
+            errors += self.error_queue_drain()
+            pass
+        if errors:
+            self._cache_revert()
+            handler.check(*errors[0])
+            pass
+        return
+
+    def _parse_errors(self, responses):
+        errors = []
+        for ret in responses:
+            num, _, msg = ret.partition(',')
+            num = int(num)
+            if num == 0: break
+            errors.append((num, msg.strip().strip('"')))
+            continue
+        return errors
+
+    def error_queue_drain(self, chunk=None, limit=64):
+        """
+        SYST:ERR? : Read Error Queue
+        ----------------------------
+        Read all the errors in the error queue. <chunk> SYST:ERR? queries
+        are sent in one program message until "0,No error" is returned.
+
+        Args
+        ====
+        < chunk : int :  >
+            Number of queries per program message.
+
+        < limit : int :  >
+            Maximum number of errors to read.
+
+        Returns
+        =======
+        < errors : list of (int, str) >
+            (number, message) of the errors, from the oldest.
+
+        Examples
+        ========
+        >>> s.error_queue_drain()
+        [(-113, 'Undefined header')]
+        """
+        if chunk is None: chunk = self._error_chunk
+        errors = []
+        query = (';' + self._batch_root).join(['SYST:ERR?'] * chunk)
+        while len(errors) < limit:
+            self.com.send(query)
+            ret = batch.split_response(self.com.readline().strip())
+            new = self._parse_errors(ret)
+            errors += new
+            if len(new) < len(ret): break
+            continue
+        return errors
@@ -0,0 +1,14 @@
+from .instrument import instrument
+from .instrument import scpi_instrument
+from .agilent import N9938A
+from .agilent import N9342
+from .agilent import E4418
+from .agilent import E4419
+from .lakeshore import model218
+from .pfeiffer import tpg261
+from .cosmotechs import sp100
+from .anritsu import ma24126a
+from .anritsu import ml2437a
+from .prologix import prologix
+from .server import tcp_server
+from .server import pty_server
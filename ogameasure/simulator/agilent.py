@@ -0,0 +1,312 @@
+import time
+import numpy
+from .instrument import scpi_instrument
+from .instrument import parse_value, parse_args
+
+
+class spectrum_analyzer(scpi_instrument):
+    """
+    Simulated swept spectrum analyzer.
+
+    The trace is a noise floor with a single tone at <tone_freq>, sent as
+    ASCII or as a REAL,32 block according to FORM:DATA and FORM:BORD.
+    Numeric settings are kept in <settings> and answered by their queries.
+    """
+    points = 401
+    noise_floor = -90.
+    tone_freq = 1e9
+    tone_power = -30.
+
+    # header (without '?') : (key, default)
+    _settings = {}
+
+    def reset(self):
+        scpi_instrument.reset(self)
+        self.points = type(self).points
+        self.start = 0.
+        self.stop = 3e9
+        self.settings = {key: default for key, default in self._settings.values()}
+        self.rng = numpy.random.RandomState(0)
+        return
+
+    def dispatch(self, header, args):
+        key = header.rstrip('?')
+        if key in self._settings:
+            name = self._settings[key][0]
+            if header.endswith('?'):
+                return self.format_setting(self.settings[name])
+            self.settings[name] = self.parse_setting(args)
+            return None
+        return scpi_instrument.dispatch(self, header, args)
+
+    def parse_setting(self, args):
+        try:
+            return parse_value(args)
+        except (ValueError, KeyError):
+            return args.upper()
+
+    def format_setting(self, value):
+        if type(value) != float: return value
+        if value.is_integer(): return '%d'%(value)
+        return '%.10E'%(value)
+
+    def frequency(self, m, args):
+        name = m.group(1)
+        if args == '':
+            if name == 'STAR': v = self.start
+            elif name == 'STOP': v = self.stop
+            elif name == 'CENT': v = (self.start + self.stop) / 2
+            else: v = self.stop - self.start
+            return '%.10E'%(v)
+        value = parse_value(args)
+        if name == 'STAR': self.start = value
+        elif name == 'STOP': self.stop = value
+        else:
+            center = (self.start + self.stop) / 2
+            span = self.stop - self.start
+            if name == 'CENT': center = value
+            else: span = value
+            self.start = center - span / 2
+            self.stop = center + span / 2
+            pass
+        return None
+
+    def trace(self):
+        x = numpy.linspace(self.start, self.stop, self.points)
+        y = self.noise_floor + self.rng.normal(0, 0.5, self.points)
+        width = max((self.stop - self.start) / self.points, 1.)
+        y = numpy.maximum(y, self.tone_power - ((x - self.tone_freq) / width) ** 2)
+        return y
+
+    def trace_data(self, m, args):
+        y = self.trace()
+        if self.settings.get('format', 'ASC').startswith('REAL'):
+            dtype = '<f4' if self.settings.get('byte_order') == 'SWAP' else '>f4'
+            data = y.astype(dtype).tobytes()
+            length = '%d'%(len(data))
+            return '#%d%s'%(len(length), length) + data.decode('latin-1')
+        return ','.join('%.6f'%(v) for v in y)
+
+    def initiate(self, m, args):
+        return None
+
+    def system_time(self, m, args):
+        if args == '': return time.strftime('%H,%M,%S')
+        return None
+
+    def system_date(self, m, args):
+        if args == '': return time.strftime('%Y,%m,%d')
+        return None
+
+    _commands = [
+        (r'FREQ:(STAR|STOP|CENT|SPAN)\??', 'frequency'),
+        (r'SYST:TIME\??', 'system_time'),
+        (r'SYST:DATE\??', 'system_date'),
+        (r'INIT(:IMM)?', 'initiate'),
+    ]
+
+
+class N9938A(spectrum_analyzer):
+    product_name = 'N9938A'
+    idn = 'Keysight Technologies,N9938A,SIM00001,A.00.00'
+
+    _settings = {
+        'FORM:DATA': ('format', 'ASC'),
+        'FORM:BORD': ('byte_order', 'NORM'),
+        'DISP:WIND:TRAC:Y:RLEV': ('rlev', 0.),
+        'DISP:WIND:TRAC:Y:PDIV': ('pdiv', 'DIV10'),
+        'AMPL:SCAL': ('scale', 'LOG'),
+        'POW:ATT': ('att', 10.),
+        'POW:ATT:AUTO': ('att_auto', '1'),
+        'BAND': ('rbw', 3e6),
+        'BAND:AUTO': ('rbw_auto', '1'),
+        'BAND:VID': ('vbw', 3e6),
+        'BAND:VID:AUTO': ('vbw_auto', '1'),
+        'AVER:COUN': ('average', '1'),
+        'SWE:TIME': ('sweep_time', 0.1),
+        'RAD:CHAN:CENT': ('channel', '1'),
+        'INIT:CONT': ('continuous', 1.),
+    }
+
+    def average_state(self, m, args):
+        if args == '': return '0'
+        return None
+
+    def sweep_points(self, m, args):
+        if args == '': return '%d'%(self.points)
+        self.points = int(parse_value(args))
+        return None
+
+    _commands = spectrum_analyzer._commands + [
+        (r'SWE:POIN\??', 'sweep_points'),
+        (r'TRAC[1-4]:DATA\?', 'trace_data'),
+        (r'AVER:TRAC[1-4]', 'average_state'),
+        (r'SYST:GPS:AVER[1-4]\?', 'average_state'),
+        (r'INIT:REST[1-4]?', 'average_state'),
+    ]
+
+
+class N9342(spectrum_analyzer):
+    product_name = 'N9342C'
+    idn = 'Agilent Technologies,N9342C,SIM00001,A.00.00'
+    points = 461
+
+    _settings = {
+        'FORM:DATA': ('format', 'ASC'),
+        'FORM:BORD': ('byte_order', 'NORM'),
+        'DISP:WIND:TRAC:Y:RLEV': ('rlev', 0.),
+        'DISP:WIND:TRAC:Y:PDIV': ('pdiv', 'DIV10'),
+        'DISP:WIND:TRAC:Y:SPAC': ('scale', 'LOG'),
+        'POW:ATT': ('att', 10.),
+        'POW:ATT:AUTO': ('att_auto', '1'),
+        'BAND': ('rbw', 3e6),
+        'BAND:AUTO': ('rbw_auto', '1'),
+        'BAND:VID': ('vbw', 3e6),
+        'BAND:VID:AUTO': ('vbw_auto', '1'),
+        'SWE:TIME': ('sweep_time', 0.1),
+        'FREQ:CENT:CHAN': ('channel', '1'),
+        'INIT:CONT': ('continuous', 1.),
+    }
+
+    def average(self, m, args):
+        if args == '' and m.group(0).endswith('?'): return '0'
+        return None
+
+    _commands = spectrum_analyzer._commands + [
+        (r'TRACE:DATA\?', 'trace_data'),
+        (r'AVER:TRAC[1-4](:COUN|:CLE)?\??', 'average'),
+    ]
+
+
+class E4418(scpi_instrument):
+    """
+    Simulated E4418 power meter. MEAS? and FETC? return <power> dBm
+    (<power2> dBm for the channel 2).
+
+    A measurement started by INIT takes <reading_time> times the filter
+    length (if averaging is on), and zeroing takes <zero_time>. *OPC sets
+    the operation complete bit of *ESR? when they have finished. FETC?
+    returns the reading of the last INIT (counted in <initiated>), or with
+    INIT:CONT ON and <reading_time> > 0, the same value until the next
+    measurement has finished.
+    """
+    product_name = 'E4418B'
+    idn = 'Agilent Technologies,E4418B,SIM00001,A1.00.00'
+    power = -10.
+    power2 = -20.
+    reading_time = 0.
+    zero_time = 0.
+
+    def reset(self):
+        scpi_instrument.reset(self)
+        self.average = {1: 1, 2: 1}
+        self.count = {1: 16, 2: 16}
+        self.valid = {1: False, 2: False}
+        self.continuous = {1: 0, 2: 0}
+        self.busy_until = 0.
+        self.opc_pending = False
+        self.fetched = {1: (None, None), 2: (None, None)}
+        self.reading = {1: None, 2: None}
+        self.initiated = {1: 0, 2: 0}
+        return
+
+    def common(self, header, args):
+        if header == '*OPC':
+            self.opc_pending = True
+            return None
+        if header == '*ESR?' and self.opc_pending:
+            if time.time() >= self.busy_until:
+                self.esr |= self._opc
+                self.opc_pending = False
+                pass
+            pass
+        return scpi_instrument.common(self, header, args)
+
+    def _value(self, ch):
+        power = self.power if ch == 1 else self.power2
+        return '%+.6E'%(power + self.random.gauss(0, 0.01))
+
+    def measure(self, m, args):
+        ch = int(m.group(1) or 1)
+        self.valid[ch] = True
+        return self._value(ch)
+
+    def configure(self, m, args):
+        ch = int(m.group(1) or 1)
+        self.valid[ch] = False
+        self.continuous[ch] = 0
+        self.reading[ch] = None
+        return None
+
+    def abort(self, m, args):
+        ch = int(m.group(1) or 1)
+        self.valid[ch] = bool(self.continuous[ch])
+        return None
+
+    def initiate(self, m, args):
+        ch = int(m.group(1) or 1)
+        count = self.count[ch] if self.average[ch] else 1
+        self.busy_until = time.time() + self.reading_time * count
+        self.valid[ch] = True
+        self.reading[ch] = self._value(ch)
+        self.initiated[ch] += 1
+        return None
+
+    def initiate_continuous(self, m, args):
+        ch = int(m.group(1) or 1)
+        if args == '': return '%d'%(self.continuous[ch])
+        self.continuous[ch] = int(args in ('1', 'ON'))
+        if self.continuous[ch]: self.valid[ch] = True
+        return None
+
+    def fetch(self, m, args):
+        ch = int(m.group(1) or 1)
+        if not self.valid[ch]:
+            self.push_error(-230, 'Data corrupt or stale', self._exe)
+            return None
+        if not self.continuous[ch] and self.reading[ch] is not None:
+            return self.reading[ch]
+        if not (self.continuous[ch] and self.reading_time):
+            return self._value(ch)
+        count = self.count[ch] if self.average[ch] else 1
+        cycle = int(time.time() / (self.reading_time * count))
+        if self.fetched[ch][0] != cycle:
+            self.fetched[ch] = (cycle, self._value(ch))
+            pass
+        return self.fetched[ch][1]
+
+    def average_state(self, m, args):
+        ch = int(m.group(1) or 1)
+        if args == '': return '%d'%(self.average[ch])
+        self.average[ch] = int(args in ('1', 'ON'))
+        return None
+
+    def average_count(self, m, args):
+        ch = int(m.group(1) or 1)
+        if args == '': return '%d'%(self.count[ch])
+        self.count[ch] = int(parse_args(args)[0])
+        return None
+
+    def zero(self, m, args):
+        self.busy_until = time.time() + self.zero_time
+        return None
+
+    _commands = [
+        (r'MEAS([12])?\?', 'measure'),
+        (r'CONF([12])?', 'configure'),
+        (r'ABOR([12])?', 'abort'),
+        (r'INIT([12])?(:IMM)?', 'initiate'),
+        (r'INIT([12])?:CONT\??', 'initiate_continuous'),
+        (r'FETC([12])?\?', 'fetch'),
+        (r'SENS([12])?:AVER\??', 'average_state'),
+        (r'SENS([12])?:AVER:COUN\??', 'average_count'),
+        (r'CAL([12])?:ZERO:AUTO', 'zero'),
+    ]
+
+
+class E4419(E4418):
+    """
+    Simulated E4419 dual channel power meter.
+    """
+    product_name = 'E4419B'
+    idn = 'Agilent Technologies,E4419B,SIM00001,A1.00.00'
@@ -0,0 +1,71 @@
+from .instrument import instrument
+
+
+class ma24126a(instrument):
+    """
+    Simulated Anritsu MA24126A USB power sensor.
+
+    Each command is answered with one line: 'OK' for a setting, the value
+    for a query, and <power> dBm (with noise) for PWR?.
+    """
+    product_name = 'MA24126A'
+    power = -20.
+
+    # command : (key, default)
+    _settings = {
+        'AVGTYP': ('avgtyp', '0'),
+        'AUTOAVG': ('autoavg', '1'),
+        'AVGCNT': ('avgcnt', '1'),
+        'CHAPERT': ('chapert', '10.00'),
+        'CHMOD': ('chmod', '0'),
+        'FREQ': ('freq', '1.00'),
+    }
+
+    def reset(self):
+        self.settings = {key: default for key, default in self._settings.values()}
+        self.started = False
+        return
+
+    def handle(self, msg):
+        header, _, args = msg.strip().partition(' ')
+        header = header.upper()
+        if header == 'PWR?':
+            return '%.3f\n'%(self.power + self.random.gauss(0, 0.01))
+        if header in ('START', 'ZERO'):
+            self.started = True
+            return 'OK\n'
+        query = header.endswith('?')
+        key = self._settings.get(header.rstrip('?'), (None,))[0]
+        if key is None: return 'ERR\n'
+        if query: return self.settings[key] + '\n'
+        self.settings[key] = args.strip()
+        return 'OK\n'
+
+
+class ml2437a(instrument):
+    """
+    Simulated Anritsu ML2437A/ML2438A power meter.
+
+    Commands in a message are separated by ';'. 'O <ch>' outputs <power>
+    (dBm, with noise) of the channel, one line each. The settings are
+    kept in <commands> in the order received.
+    """
+    product_name = 'ML2438A'
+    power = {1: -10., 2: -20.}
+
+    def reset(self):
+        self.commands = []
+        return
+
+    def handle(self, msg):
+        out = ''
+        for unit in msg.split(';'):
+            header, _, args = unit.strip().partition(' ')
+            if header.upper() == 'O':
+                ch = int(args)
+                out += '%.3f\n'%(self.power[ch] + self.random.gauss(0, 0.01))
+            elif header != '':
+                self.commands.append(unit.strip())
+                pass
+            continue
+        return out or None
@@ -0,0 +1,65 @@
+from .instrument import instrument
+
+
+class sp100(instrument):
+    """
+    Simulated COSMOTECHS SP100 motor controller.
+
+    Frames are STX + unit + command + data + ETX + BCC. Set commands are
+    answered with ACK; read commands with ACK followed by a framed reply.
+    """
+    product_name = 'SP100'
+    com_terminator = ''
+    com_recv_str = True
+
+    def reset(self):
+        self.positions = [0., 0., 0., 0.]
+        self.status = '01'
+        self.output = 0
+        return
+
+    @staticmethod
+    def _bcc(d):
+        tmp = 0
+        for c in d:
+            tmp ^= c
+            continue
+        return ('%02X'%(tmp)).encode()
+
+    def feed(self, data):
+        if type(data) == str: data = data.encode()
+        out = b''
+        with self.lock:
+            self._inbuf += data
+            while True:
+                start = self._inbuf.find(b'\x02')
+                end = self._inbuf.find(b'\x03', start + 1)
+                if start == -1 or end == -1 or len(self._inbuf) < end + 3: break
+                frame = self._inbuf[start + 1:end]
+                self._inbuf = self._inbuf[end + 3:]
+                if frame == b'\x06' or frame == b'\x15': continue
+                self.delay(frame[1:3].decode('latin-1'))
+                out += self.handle_frame(frame)
+                continue
+            pass
+        return out
+
+    def _reply(self, frame, data):
+        body = frame[:3] + data.encode()
+        return b'\x06\x02' + body + b'\x03' + self._bcc(body)
+
+    def handle_frame(self, frame):
+        command = frame[1:3]
+        data = frame[3:].decode('latin-1')
+        if command == b'\x40\x20':
+            return self._reply(frame, ','.join('%.3f'%(p) for p in self.positions))
+        if command == b'\x30\x22':
+            for i, v in enumerate(data.split(',')[:4]):
+                if v != '': self.positions[i] = float(v)
+                continue
+            return b'\x06'
+        if command == b'\x30\x2a':
+            return self._reply(frame, self.status)
+        if command == b'\x30\x28' and data == '':
+            return self._reply(frame, '%08X'%(self.output))
+        return b'\x06'
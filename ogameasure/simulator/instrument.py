@@ -0,0 +1,223 @@
+import re
+import time
+import random
+import threading
+from ..device.SCPI import scpi
+from ..device.SCPI import batch
+
+
+class instrument(object):
+    """
+    Base class of simulated instruments.
+
+    An instrument consumes the bytes written by the host with feed(), and
+    returns the bytes it answers. Messages are split by <terminator> and
+    passed to handle().
+
+    Each message is delayed by <latency> + uniform(-<jitter>, <jitter>)
+    seconds. <command_latency> overrides the latency for messages that
+    start with the given key, e.g. {'TRAC': 0.05, 'MEAS': 0.3}.
+    """
+    manufacturer = ''
+    product_name = ''
+
+    terminator = b'\n'
+    response_terminator = '\n'
+
+    # default settings for a loopback communicator talking to this device
+    com_terminator = '\n'
+    com_recv_str = False
+
+    def __init__(self, latency=0., jitter=0., command_latency=None, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.command_latency = command_latency or {}
+        self.random = random.Random(seed)
+        self.lock = threading.RLock()
+        self._inbuf = b''
+        self.reset()
+        pass
+
+    def reset(self):
+        pass
+
+    def delay(self, msg):
+        latency = self.latency
+        for key, value in self.command_latency.items():
+            if msg.startswith(key):
+                latency = value
+                break
+            continue
+        if self.jitter:
+            latency += self.random.uniform(-self.jitter, self.jitter)
+            pass
+        if latency > 0:
+            time.sleep(latency)
+            pass
+        return
+
+    def feed(self, data):
+        if type(data) == str: data = data.encode()
+        out = b''
+        with self.lock:
+            self._inbuf += data
+            while True:
+                msg, sep, rest = self._inbuf.partition(self.terminator)
+                if sep == b'': break
+                self._inbuf = rest
+                msg = msg.decode('latin-1').strip('\r')
+                if msg.strip() == '': continue
+                self.delay(msg)
+                ret = self.handle(msg)
+                if ret is not None:
+                    out += ret.encode('latin-1')
+                    pass
+                continue
+            pass
+        return out
+
+    def handle(self, msg):
+        return None
+
+    def status_byte(self):
+        return 0
+
+
+class scpi_instrument(instrument):
+    """
+    Simulated SCPI instrument.
+
+    A program message is split into message units by ';', and each unit is
+    dispatched to the first entry of <_commands> whose regular expression
+    matches the (upper case) header. Handlers are called as
+    handler(match, args) and return the response string for queries.
+    Responses of the queries in a program message are joined with ';'.
+
+    The common commands of scpi.scpi_common, 'SYST:ERR?' and the error
+    queue / Standard Event Status Register are implemented here.
+    """
+    idn = 'ogameasure,simulator,0,0'
+
+    _commands = []
+
+    # Standard Event Status Register bits
+    _opc = 0x01
+    _qye = 0x04
+    _dde = 0x08
+    _exe = 0x10
+    _cme = 0x20
+
+    def reset(self):
+        self.errors = []
+        self.esr = 0
+        self.ese = 0
+        self.sre = 0
+        self._compiled = [(re.compile(p + '$'), h) for p, h in self._commands]
+        return
+
+    def push_error(self, num, msg, bit):
+        if len(self.errors) < 30:
+            self.errors.append((num, msg))
+            pass
+        self.esr |= bit
+        return
+
+    def handle(self, msg):
+        responses = []
+        path = ''
+        for unit in batch.split_response(msg):
+            unit = unit.strip()
+            if unit == '': continue
+            header, _, args = unit.partition(' ')
+            header = header.upper()
+            if header.startswith('*'):
+                pass
+            elif header.startswith(':'):
+                header = header[1:]
+            else:
+                header = path + header
+                pass
+            if not header.startswith('*'):
+                path = header.rpartition(':')[0]
+                if path != '': path += ':'
+                pass
+            try:
+                ret = self.dispatch(header, args.strip())
+            except (ValueError, IndexError, KeyError):
+                self.push_error(-224, 'Illegal parameter value', self._exe)
+                ret = None
+                pass
+            if ret is not None:
+                responses.append(str(ret))
+                pass
+            continue
+        if not responses: return None
+        return ';'.join(responses) + self.response_terminator
+
+    def dispatch(self, header, args):
+        if header in scpi.scpi_common._scpi_dict or header in ('*TRG',):
+            return self.common(header, args)
+        if header == 'SYST:ERR?':
+            return self.error_query()
+        for pattern, handler in self._compiled:
+            m = pattern.match(header)
+            if m is not None:
+                return self.__getattribute__(handler)(m, args)
+            continue
+        self.push_error(-113, 'Undefined header', self._cme)
+        return None
+
+    def common(self, header, args):
+        if header == '*IDN?': return self.idn
+        if header == '*OPC?': return '1'
+        if header == '*OPC':
+            self.esr |= self._opc
+            return None
+        if header == '*ESR?':
+            ret, self.esr = self.esr, 0
+            return '%d'%(ret)
+        if header == '*ESE': self.ese = int(args); return None
+        if header == '*ESE?': return '%d'%(self.ese)
+        if header == '*SRE': self.sre = int(args); return None
+        if header == '*SRE?': return '%d'%(self.sre)
+        if header == '*STB?': return '%d'%(self.status_byte())
+        if header == '*CLS':
+            self.errors = []
+            self.esr = 0
+            return None
+        if header == '*RST':
+            self.reset()
+            return None
+        if header.endswith('?'): return '0'
+        return None
+
+    def status_byte(self):
+        stb = 0
+        if self.errors: stb |= 0x04
+        if self.esr & self.ese: stb |= 0x20
+        return stb
+
+    def error_query(self):
+        if not self.errors: return '+0,"No error"'
+        num, msg = self.errors.pop(0)
+        return '%+d,"%s"'%(num, msg)
+
+
+# Helper Functions
+# ================
+
+_unit_factor = {
+    '': 1, 'HZ': 1, 'KHZ': 1e3, 'MHZ': 1e6, 'GHZ': 1e9,
+    'S': 1, 'MS': 1e-3, 'US': 1e-6,
+    'DB': 1, 'DBM': 1,
+}
+
+def parse_value(args):
+    """Parse a numeric parameter with an optional unit, e.g. '1.5 GHz'."""
+    m = re.match(r'\s*([-+0-9.eE]+)\s*([a-zA-Z]*)', args)
+    if m is None: raise ValueError(args)
+    return float(m.group(1)) * _unit_factor[m.group(2).upper()]
+
+def parse_args(args):
+    """Split the parameters separated by spaces and/or commas."""
+    return [a for a in re.split(r'[\s,]+', args.strip()) if a != '']
@@ -0,0 +1,96 @@
+import time
+from .instrument import scpi_instrument
+from .instrument import parse_args
+
+
+class model218(scpi_instrument):
+    """
+    Simulated Lakeshore model 218 temperature monitor.
+
+    Input n reads <temperature> + n K. The user curves 21-28 start empty
+    and can be written with CRVPT.
+    """
+    product_name = 'model 218'
+    idn = 'LSCI,MODEL218S,SIM0001,000000'
+    response_terminator = '\r\n'
+    com_terminator = '\r\n'
+    temperature = 300.
+
+    def reset(self):
+        scpi_instrument.reset(self)
+        self.curves = {}
+        for c in range(1, 10):
+            self.curves[c] = [(0.1 + 0.01 * i, 1. + 1.5 * i) for i in range(200)]
+            continue
+        for c in range(21, 29):
+            self.curves[c] = [(0., 0.)] * 200
+            continue
+        self.filters = {ch: (1, 5, 2) for ch in range(1, 9)}
+        self.inputs = {ch: 1 for ch in range(1, 9)}
+        self.incurves = {ch: 21 for ch in range(1, 9)}
+        return
+
+    def _readings(self, ch, offset):
+        values = [self.temperature + offset + i + self.random.gauss(0, 0.001)
+                  for i in range(1, 9)]
+        if ch != 0: values = [values[ch - 1]]
+        return ','.join('%+.3f'%(v) for v in values)
+
+    def kelvin_reading(self, m, args):
+        return self._readings(int(args or 0), 0.)
+
+    def celsius_reading(self, m, args):
+        return self._readings(int(args or 0), -273.15)
+
+    def sensor_reading(self, m, args):
+        ch = int(args or 0)
+        values = ['%+.5f'%(1. - 0.001 * i) for i in range(1, 9)]
+        if ch != 0: values = [values[ch - 1]]
+        return ','.join(values)
+
+    def curve_point(self, m, args):
+        a = parse_args(args)
+        curve, index = int(a[0]), int(a[1])
+        if m.group(1) == '?':
+            return '%+.5f,%+.3f'%(self.curves[curve][index - 1])
+        self.curves[curve][index - 1] = (float(a[2]), float(a[3]))
+        return None
+
+    def curve_header(self, m, args):
+        curve = int(parse_args(args)[0])
+        return 'SIM-%02d,SN%06d,2,+325.0,1'%(curve, curve)
+
+    def filter(self, m, args):
+        a = parse_args(args)
+        if m.group(1) == '?':
+            return '%d,%d,%d'%(self.filters[int(a[0])])
+        self.filters[int(a[0])] = (int(a[1]), int(a[2]), int(a[3]))
+        return None
+
+    def input_control(self, m, args):
+        a = parse_args(args)
+        if m.group(1) == '?': return '%d'%(self.inputs[int(a[0])])
+        self.inputs[int(a[0])] = int(a[1])
+        return None
+
+    def input_curve(self, m, args):
+        a = parse_args(args)
+        if m.group(1) == '?': return '%02d'%(self.incurves[int(a[0])])
+        self.incurves[int(a[0])] = int(a[1])
+        return None
+
+    def datetime(self, m, args):
+        if m.group(1) == '?': return time.strftime('%m,%d,%y,%H,%M,%S')
+        return None
+
+    _commands = [
+        (r'KRDG\?', 'kelvin_reading'),
+        (r'CRDG\?', 'celsius_reading'),
+        (r'SRDG\?', 'sensor_reading'),
+        (r'CRVPT(\?)?', 'curve_point'),
+        (r'CRVHDR\?', 'curve_header'),
+        (r'FILTER(\?)?', 'filter'),
+        (r'INPUT(\?)?', 'input_control'),
+        (r'INCRV(\?)?', 'input_curve'),
+        (r'DATETIME(\?)?', 'datetime'),
+    ]
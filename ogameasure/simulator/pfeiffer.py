@@ -0,0 +1,75 @@
+from .instrument import instrument
+
+
+class tpg261(instrument):
+    """
+    Simulated Pfeiffer TPG261 vacuum gauge controller.
+
+    A mnemonic is acknowledged with ACK (or NAK if unknown), and the data
+    are sent when the host requests them with ENQ.
+    """
+    product_name = 'TPG261'
+    response_terminator = '\r\n'
+    com_terminator = ''
+
+    pressure = [1.0e-3, 2.0e-2]
+
+    _replies = {
+        'SEN': '2,2',
+        'TID': 'PKR,noSen',
+        'SCT': '0',
+        'RES': '0',
+        'UNI': '0',
+        'DCD': '2',
+        'PNR': 'BG551161-A',
+        'COM': '',
+    }
+
+    def reset(self):
+        self.data = None
+        return
+
+    def feed(self, data):
+        if type(data) == str: data = data.encode()
+        out = b''
+        with self.lock:
+            self._inbuf += data
+            while True:
+                i_enq = self._inbuf.find(b'\x05')
+                i_term = self._inbuf.find(self.terminator)
+                if i_enq == -1 and i_term == -1: break
+                if i_enq != -1 and (i_term == -1 or i_enq < i_term):
+                    self._inbuf = self._inbuf[i_enq + 1:]
+                    msg = '\x05'
+                else:
+                    msg = self._inbuf[:i_term].decode('latin-1').strip()
+                    self._inbuf = self._inbuf[i_term + 1:]
+                    if msg == '': continue
+                    pass
+                self.delay(msg)
+                out += self.handle(msg).encode('latin-1')
+                continue
+            pass
+        return out
+
+    def _pressure(self, ch):
+        return '0,%.4E'%(self.pressure[ch - 1])
+
+    def handle(self, msg):
+        if msg == '\x05':
+            data = self.data
+            if data is None: data = '0000'
+            self.data = None
+            return data + self.response_terminator
+        mnemonic = msg.split(',')[0].strip()
+        if mnemonic == 'PRX':
+            self.data = self._pressure(1) + ',' + self._pressure(2)
+        elif mnemonic in ('PR1', 'PR2'):
+            self.data = self._pressure(int(mnemonic[2]))
+        elif mnemonic in self._replies:
+            self.data = self._replies[mnemonic]
+        else:
+            # syntax error
+            self.data = '0001'
+            return '\x15' + self.response_terminator
+        return '\x06' + self.response_terminator
@@ -0,0 +1,59 @@
+from .instrument import instrument
+
+
+class prologix(instrument):
+    """
+    Simulated Prologix GPIB-ETHERNET adapter.
+
+    <devices> is a dict of {gpib address: simulated instrument}. Lines
+    starting with '++' are adapter commands; other lines are written to
+    the addressed device, whose response is held until '++read' (or read
+    automatically in '++auto 1' mode).
+    """
+    product_name = 'GPIB-ETHERNET'
+    version = 'Prologix GPIB-ETHERNET Controller version 01.06.06.00'
+
+    def __init__(self, devices, latency=0., jitter=0., command_latency=None,
+                 seed=None):
+        self.devices = devices
+        instrument.__init__(self, latency, jitter, command_latency, seed)
+        pass
+
+    def reset(self):
+        self.addr = 10
+        self.mode = 1
+        self.auto = 0
+        self.eoi = 1
+        self.pending = {addr: b'' for addr in self.devices}
+        return
+
+    def handle(self, msg):
+        if not msg.startswith('++'):
+            dev = self.devices.get(self.addr)
+            if dev is None: return None
+            self.pending[self.addr] += dev.feed(msg.encode('latin-1') + dev.terminator)
+            if self.auto: return self._read()
+            return None
+        cmd, _, args = msg[2:].partition(' ')
+        args = args.strip()
+        if cmd == 'addr':
+            if args == '': return '%d\n'%(self.addr)
+            self.addr = int(args)
+        elif cmd in ('mode', 'auto', 'eoi'):
+            if args == '': return '%d\n'%(getattr(self, cmd))
+            setattr(self, cmd, int(args))
+        elif cmd == 'read':
+            return self._read()
+        elif cmd == 'spoll':
+            addr = int(args) if args else self.addr
+            stb = self.devices[addr].status_byte() if addr in self.devices else 0
+            if self.pending.get(addr): stb |= 0x10
+            return '%d\n'%(stb)
+        elif cmd == 'ver':
+            return self.version + '\n'
+        return None
+
+    def _read(self):
+        ret = self.pending.get(self.addr, b'')
+        self.pending[self.addr] = b''
+        return ret.decode('latin-1')
@@ -0,0 +1,114 @@
+import os
+import tty
+import select
+import threading
+import socketserver
+
+
+class _handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        inst = self.server.instrument
+        while True:
+            try:
+                data = self.request.recv(65536)
+            except OSError:
+                break
+            if not data: break
+            out = inst.feed(data)
+            if out: self.request.sendall(out)
+            continue
+        return
+
+
+class _tcp_server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class tcp_server(object):
+    """
+    Serve a simulated instrument over TCP.
+
+    >>> srv = tcp_server(simulator.N9938A())
+    >>> srv.start()
+    >>> com = ogameasure.ethernet(srv.host, srv.port)
+
+    <port> = 0 selects a free port.
+    """
+
+    def __init__(self, instrument, host='127.0.0.1', port=0):
+        self.instrument = instrument
+        self.server = _tcp_server((host, port), _handler)
+        self.server.instrument = instrument
+        self.host, self.port = self.server.server_address[:2]
+        self.thread = None
+        pass
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        return
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+        return
+
+
+class pty_server(object):
+    """
+    Serve a simulated instrument on a pseudo terminal (POSIX only).
+
+    >>> srv = pty_server(simulator.sp100())
+    >>> srv.start()
+    >>> com = ogameasure.serial(srv.port, timeout=1)
+    """
+
+    def __init__(self, instrument):
+        self.instrument = instrument
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)
+        self.port = os.ttyname(self.slave)
+        self.running = False
+        self.thread = None
+        pass
+
+    def _serve(self):
+        while self.running:
+            r, _, _ = select.select([self.master], [], [], 0.1)
+            if not r: continue
+            try:
+                data = os.read(self.master, 65536)
+            except OSError:
+                break
+            out = self.instrument.feed(data)
+            if out: os.write(self.master, out)
+            continue
+        return
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        self.thread.join()
+        os.close(self.master)
+        os.close(self.slave)
+        return
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+        return
@@ -38,6 +38,7 @@ setuptools.setup(
         "ogameasure.device.TandD",
         "ogameasure.device.SENA",
         "ogameasure.interface",
+        "ogameasure.simulator",
     ],
     classifiers=[
         "Operating System :: POSIX :: Linux",
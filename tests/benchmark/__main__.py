@@ -0,0 +1,3 @@
+from .workloads import main
+
+main()
@@ -0,0 +1,21 @@
+import json
+import pytest
+from . import workloads
+
+
+@pytest.mark.parametrize(
+    "name", list(workloads.workloads) + list(workloads.prologix_workloads)
+)
+def test_workload(name):
+    ret = workloads.run_workload(name, number=3)
+    assert ret["number"] == 3
+    assert ret["ops_per_sec"] > 0
+    assert ret["p50"] <= ret["p95"] <= ret["p99"]
+
+
+def test_json_output(tmp_path):
+    path = tmp_path / "bench.json"
+    workloads.main(["-n", "2", "--transport", "loopback", "--json", str(path),
+                    "E4418.measure"])
+    result = json.loads(path.read_text())
+    assert list(result["results"]) == ["E4418.measure"]
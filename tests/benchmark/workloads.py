@@ -0,0 +1,161 @@
+"""
+Transaction throughput / latency benchmark of the drivers.
+
+Each workload runs a driver method against a simulated instrument and
+reports ops/s and latency percentiles. Run as
+
+    python -m tests.benchmark --json result.json
+
+<transport> 'native' talks to the simulator through the real communicator
+(ethernet over a local TCP server, serial over a pseudo terminal), so that
+changes of the communicator layer are included in the numbers. 'loopback'
+uses the in-process loopback communicator and measures the drivers only.
+"""
+import io
+import json
+import time
+import platform
+import argparse
+import contextlib
+import numpy
+import ogameasure
+from ogameasure import simulator
+from ogameasure.device.Agilent import N9938A, E4418B
+from ogameasure.device.Lakeshore import model218
+from ogameasure.device.Pfeiffer import tpg261
+from ogameasure.device.Cosmotechs import sp100
+
+
+@contextlib.contextmanager
+def connect(inst, transport, serial=False):
+    if transport == 'loopback':
+        yield ogameasure.loopback(inst)
+    elif serial:
+        with simulator.pty_server(inst) as srv:
+            yield ogameasure.serial(srv.port, timeout=1)
+    else:
+        with simulator.tcp_server(inst) as srv:
+            yield ogameasure.ethernet(srv.host, srv.port)
+            pass
+        pass
+    return
+
+
+# workload name : (simulator factory, driver factory, call, serial)
+workloads = {
+    'N9938A.trace_data_query': (
+        simulator.N9938A, N9938A, lambda d: d.trace_data_query(), False),
+    'N9938A.trace_data_query.binary': (
+        simulator.N9938A, N9938A, lambda d: d.trace_data_query(binary=True), False),
+    'model218.kelvin_reading_query': (
+        simulator.model218, model218, lambda d: d.kelvin_reading_query(0), False),
+    'model218.curve_point_query_line': (
+        simulator.model218, model218, lambda d: d.curve_point_query_line(1), False),
+    'E4418.measure': (
+        simulator.E4418, E4418B, lambda d: d.measure(), False),
+    'E4418.measure.legacy': (
+        simulator.E4418, E4418B, lambda d: d.measure(wait=0), False),
+    'E4418.stream.100': (
+        simulator.E4418, E4418B, lambda d: d.stream(n=100).run(), False),
+    'tpg261.read_pressure': (
+        simulator.tpg261, tpg261, lambda d: d.read_pressure(), False),
+    'sp100.current_positions_query': (
+        simulator.sp100, sp100, lambda d: d.current_positions_query(), True),
+}
+
+# gpib_prologix query cycles (*IDN? of a power meter on address 13)
+# name : gpib_prologix keyword arguments
+prologix_workloads = {
+    'gpib_prologix.query.fixed': {'pacing': 'fixed'},
+    'gpib_prologix.query.eoi': {'pacing': 'eoi'},
+    'gpib_prologix.query.auto': {'pacing': 'eoi', 'auto_read': True},
+}
+
+
+def measure(call, number, warmup=1):
+    elapsed = numpy.empty(number)
+    # drivers print progress / frames, keep them out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(warmup):
+            call()
+            continue
+        for i in range(number):
+            t0 = time.perf_counter()
+            call()
+            elapsed[i] = time.perf_counter() - t0
+            continue
+        pass
+    return {
+        'number': number,
+        'ops_per_sec': number / elapsed.sum(),
+        'mean': elapsed.mean(),
+        'p50': numpy.percentile(elapsed, 50),
+        'p95': numpy.percentile(elapsed, 95),
+        'p99': numpy.percentile(elapsed, 99),
+    }
+
+
+def run_workload(name, number, transport='native', latency=0.):
+    if name in prologix_workloads:
+        inst = simulator.prologix({13: simulator.E4418()}, latency=latency)
+        with connect(inst, transport) as com:
+            gpib = ogameasure.gpib_prologix(com, 13, **prologix_workloads[name])
+            dev = E4418B(gpib)
+            ret = measure(dev.scpi_identification_query, number)
+            com.close()
+            pass
+        return ret
+    sim, driver, call, serial = workloads[name]
+    with connect(sim(latency=latency), transport, serial) as com:
+        with contextlib.redirect_stdout(io.StringIO()):
+            dev = driver(com)
+            pass
+        ret = measure(lambda: call(dev), number)
+        com.close()
+        pass
+    return ret
+
+
+def run(names=None, number=100, transport='native', latency=0.):
+    if names is None:
+        names = list(workloads) + list(prologix_workloads)
+        pass
+    results = {}
+    for name in names:
+        results[name] = run_workload(name, number, transport, latency)
+        continue
+    return {
+        'ogameasure': ogameasure.__version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'transport': transport,
+        'latency': latency,
+        'results': results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m tests.benchmark')
+    parser.add_argument('workloads', nargs='*', help='default: all')
+    parser.add_argument('-n', '--number', type=int, default=100)
+    parser.add_argument('--transport', choices=['native', 'loopback'], default='native')
+    parser.add_argument('--latency', type=float, default=0.,
+                        help='simulated instrument latency per message (sec)')
+    parser.add_argument('--json', help='write the result to this file')
+    args = parser.parse_args(argv)
+
+    result = run(args.workloads or None, args.number, args.transport, args.latency)
+
+    fmt = '%-36s %10s %10s %10s %10s'
+    print(fmt%('workload', 'ops/s', 'p50 [ms]', 'p95 [ms]', 'p99 [ms]'))
+    for name, r in result['results'].items():
+        print(fmt%(name, '%.1f'%(r['ops_per_sec']), '%.3f'%(r['p50'] * 1e3),
+                   '%.3f'%(r['p95'] * 1e3), '%.3f'%(r['p99'] * 1e3)))
+        continue
+    if args.json is not None:
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=2)
+            pass
+        pass
+    return result
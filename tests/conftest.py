@@ -0,0 +1,16 @@
+import pytest
+
+
+@pytest.fixture
+def record_sent():
+    """
+    Return a function that hooks a communicator and returns the list of
+    the messages sent through it (stripped), e.g.
+
+    >>> sent = record_sent(com)
+    """
+    def record(com):
+        sent = []
+        com.add_hook(lambda tr: tr.method == "send" and sent.append(tr.data.strip()))
+        return sent
+    return record
@@ -0,0 +1,82 @@
+import time
+import numpy
+import pytest
+import ogameasure
+from ogameasure import simulator
+from ogameasure.device.Agilent import E4418B, E4419B
+
+
+def test_power_meter_operation_complete():
+    inst = simulator.E4418()
+    inst.reading_time = 0.01
+    p = E4418B(ogameasure.loopback(inst))
+    p.average_count(4)
+    t0 = time.time()
+    assert abs(p.measure() - inst.power) < 1
+    assert 0.04 <= time.time() - t0 < 1
+    p.zeroing()
+    assert p.settle_time() == pytest.approx(4 * p.reading_time + p.poll_interval)
+
+    inst.reading_time = 10
+    with pytest.raises(TimeoutError):
+        p.measure(timeout=0.1)
+
+
+def test_power_meter_stream():
+    inst = simulator.E4418()
+    p = E4418B(ogameasure.loopback(inst))
+    got = []
+    with p.stream(n=50, depth=20, callback=lambda t, v: got.append(v)) as st:
+        t, v = st.run()
+    assert len(got) == 50 and len(v) == 20
+    assert v.dtype == numpy.float64 and numpy.all(numpy.diff(t) > 0)
+    assert numpy.allclose(v, inst.power, atol=0.1)
+    assert inst.continuous[1] == 0
+
+
+def test_power_meter_stream_new_readings(record_sent):
+    inst = simulator.E4418()
+    inst.reading_time = 0.005
+    com = ogameasure.loopback(inst)
+    p = E4418B(com)
+    p.poll_interval = 0.002
+    p.average_on_off(0)
+    sent = record_sent(com)
+    t0 = time.time()
+    t, v = p.stream(n=10).run()
+    assert time.time() - t0 >= 10 * inst.reading_time
+    assert inst.initiated[1] == 11
+    assert sum("FETC1?" in msg for msg in sent) == 10
+    # *ESR? polled at poll_interval, not in a tight loop
+    assert sent.count("*ESR?") <= 10 * (inst.reading_time / p.poll_interval + 2)
+    assert numpy.all(numpy.diff(t) >= 0.8 * inst.reading_time)
+
+    def interrupt(t, v):
+        raise KeyboardInterrupt
+
+    st = p.stream(n=10, callback=interrupt)
+    with pytest.raises(KeyboardInterrupt):
+        st.run()
+    assert st.count == 1 and inst.continuous[1] == 0
+    assert len(p.stream(callback=interrupt).run()[1]) == 1
+
+
+def test_power_meter_dual_channel():
+    inst = simulator.E4419()
+    p = E4419B(ogameasure.loopback(inst))
+    power, diff = p.acquire_dual(20, calc="difference")
+    assert power.shape == (20, 2)
+    assert numpy.allclose(power.mean(axis=0), [inst.power, inst.power2], atol=0.1)
+    assert numpy.allclose(diff, power[:, 0] - power[:, 1])
+    assert inst.continuous == {1: 0, 2: 0}
+    assert inst.initiated == {1: 20, 2: 20}
+
+    inst.reading_time = 0.002
+    p.poll_interval = 0.001
+    t0 = time.time()
+    p.acquire_dual(5)
+    assert time.time() - t0 >= 5 * 16 * inst.reading_time
+    with pytest.raises(ValueError):
+        p.acquire_dual(5, calc="ratio")
+    power, ratio = p.acquire_dual(5, unit="W", calc="ratio")
+    assert numpy.allclose(ratio, power[:, 0] / power[:, 1])
@@ -0,0 +1,73 @@
+import time
+import numpy
+import pytest
+import ogameasure
+from ogameasure import simulator
+from ogameasure.device.Anritsu import ma24126a, ml2437a
+
+
+def test_ma24126a_burst():
+    with simulator.pty_server(simulator.ma24126a()) as srv:
+        pm = ma24126a(srv.port)
+        t, p = pm.power_burst(100, window=8)
+        assert len(p) == 100 and numpy.all(numpy.diff(t) > 0)
+        assert numpy.allclose(p, simulator.ma24126a.power, atol=0.1)
+
+        cap = pm.capture(decimation=4, depth=50)
+        while cap.count < 60:
+            assert pm.check_mode() == b"0\n"
+        cap.stop()
+        t, p = cap.data()
+        assert len(p) == 50 and numpy.allclose(p, simulator.ma24126a.power, atol=0.1)
+        assert pm.check_mode() == b"0\n"
+        pm.close()
+
+
+def test_ma24126a_burst_timeout():
+    inst = simulator.ma24126a(command_latency={"PWR?": 0.01})
+    with simulator.pty_server(inst) as srv:
+        pm = ma24126a(srv.port)
+        with pytest.raises(TimeoutError):
+            pm.power_burst(16, window=8, timeout=0.05)
+        time.sleep(0.1)
+        assert pm._pm.in_waiting == 0 and pm._buffer == b"" and pm._stamps == []
+        inst.command_latency = {}
+        assert len(pm.power_burst(8)[1]) == 8
+        assert pm.check_mode() == b"0\n"
+        pm.close()
+
+
+def test_ma24126a_settings():
+    with simulator.pty_server(simulator.ma24126a()) as srv:
+        pm = ma24126a(srv.port)
+        t0 = time.time()
+        assert pm.start()
+        assert pm.change_avecnt(64)
+        assert pm.change_freq(12.5)
+        assert pm.quary2(b"FREQ?\n", 1.0) == b"12.50\n"
+        assert time.time() - t0 < 0.5
+        assert pm.check_avecnt() == b"64\n"
+        pm.close()
+
+
+def test_ml2437a_sampler():
+    inst = simulator.ml2437a()
+    pm = ml2437a(ogameasure.loopback(inst))
+    pm.initilize(ch=2)
+    assert inst.commands == ["CHUNIT 1, DBM", "CHRES 1, 3", "CHUNIT 2, DBM", "CHRES 2, 3"]
+
+    s = pm.sampler(depth=64)
+    taus, avar = s.allan_variance(1)
+    assert len(taus) == len(avar) == 0
+    assert len(s.moving_average(1, 8)) == 0 and numpy.isnan(s.mean(1))
+    s.run(1)
+    assert len(s.allan_variance(1, taus=[1])[1]) == 0
+    s.run(99)
+    t, v = s.data()
+    assert v.shape == (2, 64)
+    assert abs(s.mean(2) - inst.power[2]) < 0.1
+    assert s.moving_average(1, 8).shape == (57,)
+    lo, hi = s.minmax(1)
+    assert lo <= s.mean(1) <= hi
+    taus, avar = s.allan_variance(1)
+    assert len(taus) == len(avar) and numpy.all(avar[:-1] > 0)
@@ -0,0 +1,55 @@
+import asyncio
+import ogameasure
+from ogameasure import simulator
+from ogameasure.device.Agilent import N9938A, E4418B
+from ogameasure.device.SCPI import async_scpi_family, async_device
+
+
+def test_async_scpi_gather():
+    async def run(srv1, srv2):
+        coms = [ogameasure.async_ethernet(srv.host, srv.port) for srv in (srv1, srv2)]
+        devs = [async_scpi_family(com) for com in coms]
+        await asyncio.gather(*[d.open() for d in devs])
+        try:
+            idn = await asyncio.gather(*[d.IDNQ() for d in devs for _ in range(5)])
+        finally:
+            await asyncio.gather(*[d.close() for d in devs])
+        return [i[1] for i in idn]
+
+    with simulator.tcp_server(simulator.N9938A()) as srv1:
+        with simulator.tcp_server(simulator.E4418()) as srv2:
+            idn = asyncio.run(run(srv1, srv2))
+    assert idn == ["N9938A"] * 5 + ["E4418B"] * 5
+
+
+def test_async_device_gather():
+    async def run(srv1, srv2):
+        sa = async_device(N9938A(ogameasure.ethernet(srv1.host, srv1.port)))
+        async with sa, async_device(E4418B(ogameasure.ethernet(srv2.host, srv2.port))) as pm:
+            trace, power = await asyncio.gather(sa.trace_data_query(), pm.measure())
+        assert sa.executor._shutdown and pm.executor._shutdown
+        return trace, power
+
+    with simulator.tcp_server(simulator.N9938A()) as srv1:
+        with simulator.tcp_server(simulator.E4418()) as srv2:
+            trace, power = asyncio.run(run(srv1, srv2))
+    assert len(trace) == simulator.N9938A.points
+    assert abs(power - simulator.E4418.power) < 1
+
+
+def test_async_long_line():
+    async def run(srv):
+        dev = async_scpi_family(ogameasure.async_ethernet(srv.host, srv.port))
+        await dev.open()
+        try:
+            await dev.send("SWE:POIN 10001")
+            trace = await dev.query("TRAC1:DATA?")
+            stb = await dev.STBQ()
+        finally:
+            await dev.close()
+        return trace, stb
+
+    with simulator.tcp_server(simulator.N9938A()) as srv:
+        trace, stb = asyncio.run(run(srv))
+    assert len(trace.split(",")) == 10001 and len(trace) > 2 ** 16
+    assert isinstance(stb, int)
@@ -0,0 +1,64 @@
+import socket
+import ogameasure
+
+
+def make_pair(bufsize=16):
+    com = ogameasure.ethernet("localhost", 0)
+    com.bufsize = bufsize
+    com.sock, peer = socket.socketpair()
+    com.sock.settimeout(1)
+    com._init_buffer()
+    com.connection = True
+    return com, peer
+
+
+def test_buffered_reader():
+    com, peer = make_pair()
+    line = ",".join("%.6f" % i for i in range(1000))
+    peer.sendall(b"+1.0\r\nabc;" + line.encode() + b"\n" + b"\x00\x01\x02\x03tail")
+    assert com.readline() == "+1.0\n"
+    assert com.read_until(b";") == b"abc;"
+    assert com.readline_raw() == line.encode() + b"\n"
+    assert com.read_exact(4) == b"\x00\x01\x02\x03"
+    assert com.recv(2) == b"ta"
+    assert com.recv(1024) == b"il"
+    com.close()
+    peer.close()
+
+
+def test_read_block():
+    import numpy
+    com, peer = make_pair()
+    data = numpy.arange(100, dtype="<f4")
+    block = b"#3400" + data.tobytes()
+    peer.sendall(block + b"\n" + block + b"\r\n+0\n")
+    assert bytes(com.read_block()) == data.tobytes()
+    assert (com.read_block_array("<f4") == data).all()
+    assert com.readline() == "+0\n"
+    com.close()
+    peer.close()
+
+
+def test_readline_universal_newlines():
+    com, peer = make_pair(bufsize=4)
+    peer.sendall(b"+1.0\r")
+    assert com.readline() == "+1.0\n"
+    peer.sendall(b"\n+2.0\r+3.0\n+4.0\r\n" + b"x" * 10 + b"\n")
+    assert com.readline() == "+2.0\n"
+    assert com.readline() == "+3.0\n"
+    assert com.readline() == "+4.0\n"
+    assert com.readline() == "x" * 10 + "\n"
+    com.close()
+    peer.close()
+
+
+def test_nodelay():
+    from ogameasure import simulator
+
+    with simulator.tcp_server(simulator.E4418()) as srv:
+        for nodelay in (True, False):
+            com = ogameasure.ethernet(srv.host, srv.port, nodelay=nodelay)
+            com.open()
+            opt = com.sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY)
+            assert bool(opt) == nodelay
+            com.close()
@@ -0,0 +1,99 @@
+import time
+import threading
+import pytest
+import ogameasure
+from ogameasure import simulator
+from ogameasure.device.Agilent import N9938A, E4418B
+
+
+def make_bus(record_sent, devices, pacing="eoi", latency=0.0):
+    sim = simulator.prologix(devices, latency=latency)
+    com = ogameasure.loopback(sim)
+    sent = record_sent(com)
+    return sim, ogameasure.gpib_prologix_bus(com, pacing=pacing), sent
+
+
+def test_auto_read_sessions_from_threads(record_sent):
+    # the latency lets the other thread run between a write and its read
+    sim, bus, sent = make_bus(record_sent, {5: simulator.E4418(), 6: simulator.N9938A()}, latency=1e-4)
+    devices = [
+        (E4418B(bus.session(5, auto_read=True)), "E4418B"),
+        (N9938A(bus.session(6, auto_read=True)), "N9938A"),
+    ]
+    wrong = []
+
+    def run(dev, name):
+        for _ in range(50):
+            ret = dev.IDNQ()[1]
+            if ret != name:
+                wrong.append(ret)
+            continue
+        return
+
+    threads = [threading.Thread(target=run, args=d) for d in devices]
+    [t.start() for t in threads]
+    [t.join() for t in threads]
+    assert wrong == []
+    assert bus.lock.acquire(blocking=False)
+    bus.lock.release()
+
+
+def test_auto_off_after_open(record_sent):
+    sim, bus, sent = make_bus(record_sent, {5: simulator.E4418()}, pacing="spoll")
+    p = E4418B(bus.session(5))
+    sim.auto = 1  # left by an earlier client
+    p.com.send("*CLS")
+    assert "++auto 0" in sent and sim.auto == 0
+    assert p.IDNQ()[1] == "E4418B"
+
+
+def test_addr_sent_on_switch_only(record_sent):
+    sim, bus, sent = make_bus(record_sent, {5: simulator.E4418(), 6: simulator.N9938A()})
+    p = E4418B(bus.session(5))
+    s = N9938A(bus.session(6))
+    for _ in range(3):
+        p.IDNQ()
+        continue
+    assert sent.count("++addr 5") == 1
+    s.IDNQ()
+    p.IDNQ()
+    assert sent.count("++addr 5") == 2
+    assert sent.count("++addr 6") == 1
+    with pytest.raises(RuntimeError):
+        p.com.mode_device()
+
+
+def make_adapter(record_sent, pacing, lag=0.02):
+    sim = simulator.prologix({5: simulator.E4418()})
+    com = ogameasure.loopback(sim)
+    sent = record_sent(com)
+    p = E4418B(ogameasure.gpib_prologix(com, 5, lag=lag, pacing=pacing))
+    del sent[:]
+    return p, sent
+
+
+def test_pacing_eoi(record_sent):
+    p, sent = make_adapter(record_sent, "eoi", lag=1)
+    t0 = time.time()
+    for _ in range(5):
+        assert p.IDNQ()[1] == "E4418B"
+        continue
+    assert time.time() - t0 < 1  # no <lag> sleeps
+    assert sent.count("++read eoi") == 5
+    assert "++spoll" not in sent
+    assert len(p.com.wait_log) == 5 and p.com.last_wait >= 0
+
+
+def test_pacing_spoll(record_sent):
+    p, sent = make_adapter(record_sent, "spoll", lag=1)
+    assert p.IDNQ()[1] == "E4418B"
+    i = sent.index("*IDN?")
+    assert sent[i + 1:] == ["++spoll", "++read eoi"]
+
+
+def test_pacing_fixed(record_sent):
+    p, sent = make_adapter(record_sent, "fixed", lag=0.01)
+    t0 = time.time()
+    p.IDNQ()
+    assert time.time() - t0 >= 0.02  # write and ++read
+    assert len(p.com.wait_log) == 1
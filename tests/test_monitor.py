@@ -0,0 +1,37 @@
+import socket
+import pytest
+import ogameasure
+from ogameasure import simulator
+from ogameasure.device.Agilent import E4418B
+
+
+def test_hooks():
+    com = ogameasure.loopback(simulator.E4418())
+    events = []
+    lat = ogameasure.latency_histogram()
+    cnt = ogameasure.byte_counter()
+    err = ogameasure.error_counter()
+    pm = E4418B(com)
+    for hook in (events.append, lat, cnt, err):
+        com.add_hook(hook)
+        continue
+
+    pm.measure(wait=0)
+    pm.measure(wait=0)
+    assert [e.method for e in events[:2]] == ["send", "readline"]
+    assert events[0].data.startswith("MEAS1?")
+    assert events[0].elapsed >= 0
+
+    summary = lat.summary()
+    assert summary["MEAS1?"]["count"] == 2
+    assert summary["MEAS1?"]["p50"] <= summary["MEAS1?"]["max"]
+    assert cnt.sent > 0 and cnt.received > 0
+
+    with pytest.raises(socket.timeout):
+        com.readline()
+    assert err.timeouts == 1
+
+    com.remove_hook(events.append)
+    n = len(events)
+    pm.measure(wait=0)
+    assert len(events) == n
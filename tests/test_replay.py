@@ -0,0 +1,25 @@
+import pytest
+import ogameasure
+from ogameasure import simulator
+from ogameasure.device.Lakeshore import model218
+
+
+def test_record_replay(tmp_path):
+    path = str(tmp_path / "model218.jsonl.gz")
+    com = ogameasure.loopback(simulator.model218())
+    with ogameasure.recorder(path, com):
+        t = model218(com)
+        expected = [t.kelvin_reading_query(0) for i in range(3)]
+        header = t.curve_header_query(1)
+
+    com = ogameasure.replay(path)
+    t = model218(com)
+    assert [t.kelvin_reading_query(0) for i in range(3)] == expected
+    assert t.curve_header_query(1) == header
+    with pytest.raises(EOFError):
+        t.kelvin_reading_query(0)
+
+    com = ogameasure.replay(path, loop=True)
+    t = model218(com)
+    with pytest.raises(ValueError):
+        t.curve_header_query(1)
@@ -0,0 +1,132 @@
+import pytest
+import ogameasure
+from ogameasure import simulator
+from ogameasure.device.Agilent import N9938A
+from ogameasure.device.Agilent.E4418 import error_handler
+
+
+def test_setting_cache(record_sent):
+    com = ogameasure.loopback(simulator.N9938A())
+    sent = record_sent(com)
+    s = N9938A(com)
+    s.cache_enable(trusted=True)
+    s.reference_level_set(-10)
+    s.reference_level_set(-10)
+    assert sum(m.startswith("DISP:WIND:TRAC:Y:RLEV") for m in sent) == 1
+    s.reference_level_query()
+    del sent[:]
+    assert s.reference_level_query() == -10
+    assert sent == []
+
+    s.frequency_start_set(1)
+    s.frequency_center_set(2)
+    s.frequency_start_set(1)
+    assert sum(m.startswith("FREQ:STAR") for m in sent) == 2
+
+    s.RST()
+    del sent[:]
+    s.reference_level_set(-10)
+    assert len(sent) == 2  # write + SYST:ERR?
+
+    s.cache_disable()
+    s.reference_level_set(-10)
+    assert len(sent) == 4
+
+
+def test_setting_cache_deferred(record_sent):
+    inst = simulator.N9938A()
+    com = ogameasure.loopback(inst)
+    sent = record_sent(com)
+    s = N9938A(com)
+    s.cache_enable()
+    with pytest.raises(RuntimeError):
+        with s.batch():
+            s.reference_level_set(-20)
+            raise RuntimeError
+    del sent[:]
+    s.reference_level_set(-20)
+    assert len(sent) == 2
+
+    with pytest.raises(Exception, match="Undefined header"):
+        with s.errors_deferred():
+            s.reference_level_set(-30)
+            inst.push_error(-113, "Undefined header", inst._cme)
+    del sent[:]
+    s.reference_level_set(-30)
+    assert len(sent) == 2
+
+    with s.batch():
+        s.reference_level_set(-40)
+    del sent[:]
+    s.reference_level_set(-40)
+    assert sent == []
+
+
+def test_error_policy(record_sent):
+    inst = simulator.N9938A()
+    com = ogameasure.loopback(inst)
+    sent = record_sent(com)
+    s = N9938A(com)
+
+    with s.errors_deferred(), s.batch():
+        s.frequency_start_set(1)
+        s.frequency_stop_set(2)
+    assert len(sent) == 2  # commands + SYST:ERR? x 8
+
+    inst.push_error(-113, "Undefined header", inst._cme)
+    inst.push_error(-222, "Data out of range", inst._exe)
+    assert s.error_queue_drain(chunk=1) == [
+        (-113, "Undefined header"), (-222, "Data out of range")]
+
+    s.error_policy_set("status-byte")
+    del sent[:]
+    s.frequency_start_set(1)
+    assert sent[-1] == "*STB?"
+    inst.push_error(-113, "Undefined header", inst._cme)
+    with pytest.raises(Exception, match="Undefined header"):
+        s.frequency_start_set(1)
+    with pytest.raises(ValueError):
+        s.error_policy_set("never")
+
+
+def test_error_handler_lookup_by_number():
+    # the table entry of the number, even if the message has details
+    with pytest.raises(Exception, match=r"Queue overflow \(-350\)\n"):
+        error_handler.check(-350, "Queue overflow; 2 errors lost")
+    with pytest.raises(Exception, match="Serial Interface Fault"):
+        error_handler.check(-330, "Self-test Failed;Serial Interface Fault")
+    with pytest.raises(Exception, match=r"Unknown \(-999\)"):
+        error_handler.check(-999, "Unknown")
+
+
+def test_batch_one_round_trip(record_sent):
+    inst = simulator.N9938A()
+    com = ogameasure.loopback(inst)
+    sent = record_sent(com)
+    s = N9938A(com)
+    with s.batch():
+        s.frequency_start_set(1)
+        s.frequency_stop_set(2)
+        s.reference_level_set(-10)
+    assert len(sent) == 1
+    assert sent[0].count("SYST:ERR?") == s._error_chunk
+    assert s.frequency_stop_query() == 2e9
+
+    with pytest.raises(Exception, match="Undefined header"):
+        with s.batch():
+            s.frequency_start_set(1)
+            s.com.send("NO:SUCH:CMD")
+    assert s._error_policy == "immediate"
+
+
+def test_batch_binary_trace():
+    com = ogameasure.loopback(simulator.N9938A())
+    s = N9938A(com)
+    with s.batch():
+        s.frequency_start_set(1)
+        trace = s.trace_data_query(binary=True)
+        many = s.trace_data_query_many([1, 2], binary=True)
+        s.frequency_stop_set(2)
+    assert len(trace) == simulator.N9938A.points
+    assert many.shape == (2, simulator.N9938A.points)
+    assert s.frequency_start_query() == 1e9 and s.frequency_stop_query() == 2e9
@@ -0,0 +1,53 @@
+import ogameasure
+from ogameasure import simulator
+from ogameasure.device.Agilent import N9938A, E4418B
+from ogameasure.device.Lakeshore import model218
+from ogameasure.device.Pfeiffer import tpg261
+from ogameasure.device.Cosmotechs import sp100
+
+
+def test_scpi_common_and_error_queue():
+    s = N9938A(ogameasure.loopback(simulator.N9938A()))
+    assert s.IDNQ()[1] == "N9938A"
+    s.com.send("NO:SUCH:CMD")
+    assert s.error_query() == (-113, "Undefined header")
+    assert s.error_query() == (0, "No error")
+
+
+def test_spectrum_analyzer():
+    s = N9938A(ogameasure.loopback(simulator.N9938A()))
+    s.frequency_start_set(1)
+    s.frequency_stop_set(2)
+    assert s.frequency_center_query() == 1.5e9
+    assert len(s.trace_data_query()) == simulator.N9938A.points
+
+
+def test_model218():
+    m = model218(ogameasure.loopback(simulator.model218()))
+    assert len(m.kelvin_reading_query(0)) == 8
+    m.curve_point_set(21, 1, 1.5, 300)
+    assert m.curve_point_query(21, 1) == (1.5, 300.0)
+
+
+def test_tpg261():
+    t = tpg261(ogameasure.loopback(simulator.tpg261()))
+    assert t.read_pressure()["ch2"]["value"] == 2.0e-2
+
+
+def test_sp100_over_pty():
+    with simulator.pty_server(simulator.sp100()) as srv:
+        c = sp100(ogameasure.serial(srv.port, timeout=1))
+        c.absolute_move_command(1.0, 2.0)
+        assert c.current_positions_query() == [1.0, 2.0, 0.0, 0.0]
+
+
+def test_prologix_over_tcp():
+    sim = simulator.prologix({5: simulator.E4418(), 6: simulator.N9938A()})
+    with simulator.tcp_server(sim) as srv:
+        bus = ogameasure.gpib_prologix_bus(
+            ogameasure.ethernet(srv.host, srv.port), pacing="eoi"
+        )
+        p = E4418B(bus.session(5, auto_read=True))
+        s = N9938A(bus.session(6))
+        assert abs(p.measure(wait=0) - simulator.E4418.power) < 1
+        assert s.IDNQ()[1] == "N9938A"
@@ -0,0 +1,110 @@
+import numpy
+import pytest
+import ogameasure
+from ogameasure import simulator
+from ogameasure.device.Agilent import N9938A, N9342C
+
+
+def test_binary_trace():
+    for sim, driver in [(simulator.N9938A, N9938A), (simulator.N9342, N9342C)]:
+        inst = sim()
+        s = driver(ogameasure.loopback(inst))
+        ascii = s.trace_data_query()
+        inst.rng.seed(0)
+        binary = s.trace_data_query(binary=True)
+        assert binary.dtype == numpy.float32
+        assert numpy.allclose(ascii, binary, atol=1e-4)
+        s.binary = True
+        assert len(s.trace_data_query()) == len(ascii)
+        assert s.trace_data_query(binary=False).dtype == numpy.float64
+
+
+def test_sweep_cache(record_sent):
+    com = ogameasure.loopback(simulator.N9938A())
+    sent = record_sent(com)
+    s = N9938A(com)
+    s.frequency_start_set(1, "GHz")
+    s.frequency_stop_set(2, "GHz")
+    s.sweep_points_set(101)
+    del sent[:]
+    x = s.gen_xaxis()
+    assert sent == []
+    assert (x[0], x[-1], len(x)) == (1e9, 2e9, 101)
+    assert s.gen_xaxis() is x
+
+    s.frequency_span_set(100, "MHz")
+    x, y = s.trace_with_xaxis()
+    assert (x[0], x[-1]) == (1.45e9, 1.55e9)
+    assert len(x) == len(y) == 101
+
+    for reset in (s.RST, s.scpi_reset):
+        reset()
+        x = s.gen_xaxis()
+        assert (x[0], x[-1], len(x)) == (0, 3e9, simulator.N9938A.points)
+        s.sweep_points_set(101)
+        continue
+
+
+def test_stream_traces():
+    inst = simulator.N9938A()
+    s = N9938A(ogameasure.loopback(inst))
+    with s.stream_traces(n=7, depth=5) as st:
+        rows = [trace for trace in st]
+    assert inst.settings["continuous"] == 1
+    assert st.count == 7 and st.filled == 5
+    assert numpy.shares_memory(rows[-1], st.buffer)
+    t, w = st.waterfall()
+    assert w.shape == (5, inst.points)
+    assert (numpy.diff(t) >= 0).all()
+    assert (w[-1] == st.latest()).all()
+    assert (st.max_hold() >= st.mean() - 1e-9).all()
+
+
+def test_stream_traces_binary():
+    com = ogameasure.loopback(simulator.N9938A())
+    s = N9938A(com)
+    blocks = []
+    com.add_hook(lambda tr: tr.method == "read_block" and blocks.append(tr.data))
+    st = s.stream_traces(n=4, depth=3, binary=True)
+    assert st.mean() is None and st.max_hold() is None
+    assert st.waterfall() is None
+    with st:
+        rows = [trace.copy() for trace in st]
+    assert st.buffer.dtype == numpy.float32
+    assert len(blocks) == 4
+    for data in blocks[1:]:
+        assert numpy.shares_memory(numpy.frombuffer(data, "<f4"), st.buffer)
+    assert (st.latest() == rows[-1]).all()
+
+
+def test_sweep_plan():
+    progress = []
+    s = N9938A(ogameasure.loopback(simulator.N9938A()))
+    plan = s.sweep_plan(1e9, 2e9, rbw=1e6, points=101)
+    assert len(plan) == 20
+    x, y = plan.run(callback=lambda i, n, x, y: progress.append(i))
+    assert progress == list(range(20))
+    assert len(x) == len(y) == 20 * 100 + 1
+    assert (x[0], x[-1]) == (1e9, 2e9)
+    assert abs(x[y.argmax()] - 1e9) < 1e6
+
+    inst = simulator.N9342()
+    s = N9342C(ogameasure.loopback(inst))
+    x, y = s.sweep_plan(0.5e9, 1.5e9, rbw=3e6).run(binary=True)
+    assert len(x) == len(y)
+
+    settings = s.frequency_start_query(), s.frequency_stop_query()
+    with pytest.raises(ValueError, match="points"):
+        s.sweep_plan(2e9, 3e9, rbw=1e5, points=inst.points + 1).run()
+    assert (s.frequency_start_query(), s.frequency_stop_query()) == settings
+
+
+def test_trace_data_query_many(record_sent):
+    com = ogameasure.loopback(simulator.N9938A())
+    s = N9938A(com)
+    sent = record_sent(com)
+    for binary in (False, True):
+        del sent[:]
+        ret = s.trace_data_query_many([1, 2, 3], binary=binary)
+        assert ret.shape == (3, 401)
+        assert len(sent) == 2  # traces + SYST:ERR?
@@ -0,0 +1,27 @@
+import numpy
+from ogameasure.device.Agilent import trace_math
+
+
+def test_average_and_hold():
+    traces = numpy.array([[-10., -20.], [-13.0103, -20.]])
+    avg = trace_math.trace_average()
+    hold = trace_math.trace_hold("max")
+    for t in traces:
+        avg.add(t)
+        hold.add(t)
+    assert numpy.allclose(avg.result(), [-11.249, -20.0], atol=1e-3)
+    assert (hold.result() == traces.max(axis=0)).all()
+
+    ema = trace_math.trace_average(mode="log", alpha=0.5)
+    for t in ([0.0], [0.0], [4.0]):
+        ema.add(numpy.array(t))
+    assert ema.result()[0] == 2.0
+
+
+def test_peaks_and_markers():
+    x = numpy.linspace(0, 100, 101)
+    y = numpy.full(101, -90.0)
+    y[[20, 50, 80]] = [-30.0, -10.0, -20.0]
+    assert trace_math.peaks(x, y, n=2) == [(50.0, -10.0), (80.0, -20.0)]
+    assert trace_math.marker(x, y, 50.5) == -50.0
+    assert abs(trace_math.band_power(x, y, 49, 51) - (-9.9996)) < 1e-3